@@ -0,0 +1,48 @@
+"""
+    Measures the time to draw the menu, the AI level selector and the game board, without a display.
+    Usage: python -m benchmarks.frame_time [--frames N]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from objects.game_board import GameBoard  # noqa: E402
+from objects.menu import Menu  # noqa: E402
+
+
+def measure(draw, frames):
+    """
+        Times a drawing function.
+        :param draw: function that draws one frame
+        :param frames: number of frames
+        :return: the mean frame time in milliseconds
+    """
+    draw()
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw()
+    return 1000 * (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame time of the menu and board screens")
+    parser.add_argument("--frames", type=int, default=200, help="frames per measurement")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((900, 630))
+    menu = Menu()
+    board = GameBoard(11, 11)
+    print(f"menu:            {measure(lambda: menu.draw_menu(screen), args.frames):8.3f} ms")
+    print(f"level selector:  {measure(lambda: menu.draw_ai_level_selector(screen), args.frames):8.3f} ms")
+    print(f"board (full):    {measure(lambda: board.draw(screen), args.frames):8.3f} ms")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+    Times the hot paths of the engine and of the board on several board sizes, without a display.
+    Results are written as JSON, and a previous file can be compared against to find regressions.
+    Usage: python -m benchmarks.hot_paths [--sizes 11,51,101,201] [--only NAME] [--output FILE] [--compare FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from itertools import cycle
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from engine.distances import bfs_distances_from_edges  # noqa: E402
+from engine.mouse_ai import choose_best_move, random_move  # noqa: E402
+from engine.positions import random_position  # noqa: E402
+from objects.game_board import GameBoard  # noqa: E402
+
+DEFAULT_SIZES = "11,51,101,201"
+
+
+def position(size, rng):
+    """
+        Creates the benchmark position of a size: the mouse in the center and 5% of the cells as obstacles,
+        with a path to the edge.
+        :param size: board size
+        :param rng: the random generator
+        :return: the GameState
+    """
+    return random_position(size, size, max(5, size * size // 20), rng, escape=True)
+
+
+def incremental_best_move(state):
+    """
+        Builds a call that adds or removes an obstacle next to the mouse and chooses the best move, so the
+        distances are repaired instead of recomputed.
+        :param state: the GameState
+        :return: the function to time
+    """
+    cell = next(index for index in state.topology.neighbor_cells[state.mouse] if not state.obstacles >> index & 1)
+
+    def call():
+        state.obstacles ^= 1 << cell
+        choose_best_move(state, cache=None)
+    return call
+
+
+def picks(board, rng, count=1024):
+    """
+        Builds a call that picks the hexagon under random points of the board area.
+        :param board: the GameBoard
+        :param rng: the random generator
+        :param count: number of different points
+        :return: the function to time
+    """
+    area = board.board_rect
+    points = cycle([(area.x + rng.random() * area.width, area.y + rng.random() * area.height) for _ in range(count)])
+    return lambda: board.get_hexagon(*next(points))
+
+
+def panned_frame(board, screen):
+    """
+        Builds a call that scrolls the board back and forth and draws it, as dragging it does.
+        :param board: the GameBoard
+        :param screen: the display surface
+        :return: the function to time
+    """
+    steps = cycle([(-board.viewport.width / 4, 0), (board.viewport.width / 4, 0)])
+
+    def call():
+        board.viewport.pan(*next(steps))
+        board.view_changed()
+        board.update(screen)
+    return call
+
+
+def first_frame(board, screen):
+    """
+        Builds a call that draws a board whose background has not been rendered yet.
+        :param board: the GameBoard
+        :param screen: the display surface
+        :return: the function to time
+    """
+    def call():
+        board.background = None
+        board.draw(screen)
+    return call
+
+
+def cases(size, rng, screen):
+    """
+        Builds the functions to time on a board size.
+        :param size: board size
+        :param rng: the random generator
+        :param screen: the display surface
+        :return: a list of (name, function)
+    """
+    state = position(size, rng)
+    board = GameBoard(size, size, rng)
+    board.state = state
+    return [
+        ("bfs_distances_from_edges", lambda: bfs_distances_from_edges(state)),
+        ("choose_best_move (fresh state)", lambda: choose_best_move(state.copy(), cache=None)),
+        ("choose_best_move (incremental)", incremental_best_move(state.copy())),
+        ("choose_best_move (cached)", lambda: choose_best_move(state)),
+        ("random_move", lambda: random_move(state, rng)),
+        ("check_win (GameState.winner)", state.winner),
+        ("GameBoard.get_hexagon", picks(board, rng)),
+        ("GameBoard.__init__", lambda: GameBoard(size, size, rng)),
+        ("GameBoard.draw", lambda: board.draw(screen)),
+        ("GameBoard.draw (first frame)", first_frame(board, screen)),
+        ("GameBoard.draw (panned)", panned_frame(board, screen)),
+        ("GameBoard.random_obstacles (reset)", lambda: board.reset(rng)),
+    ]
+
+
+def measure(function, min_time, rounds):
+    """
+        Times a function: the number of calls per round grows until a round takes min_time, then several rounds
+        are timed.
+        :param function: the function to time
+        :param min_time: minimum duration of a round in seconds
+        :param rounds: number of rounds
+        :return: (calls per round, list of seconds per call, one per round)
+    """
+    function()
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls = max(calls * 2, int(calls * min_time / max(elapsed, 1e-9)))
+    timings = [elapsed / calls]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        timings.append((time.perf_counter() - start) / calls)
+    return calls, timings
+
+
+def compare(results, path, tolerance):
+    """
+        Prints the change of every benchmark against a previous run.
+        :param results: the results of this run
+        :param path: the JSON file of the previous run
+        :param tolerance: a median slower by more than this fraction is a regression
+        :return: the number of regressions
+    """
+    with open(path, encoding="utf-8") as file:
+        previous = {(result["name"], result["size"]): result for result in json.load(file)["results"]}
+    regressions = 0
+    print(f"\nCompared with {path}:")
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if old is None:
+            continue
+        ratio = result["median_us"] / old["median_us"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{result['name']:38} {result['size']:>4} {old['median_us']:>12.2f} -> {result['median_us']:>12.2f} us"
+              f"  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timings of the hot paths on several board sizes")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated board sizes")
+    parser.add_argument("--only", help="only the benchmarks whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum seconds per round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the positions")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="with --compare, the fraction a median may grow before it is a regression")
+    args = parser.parse_args()
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    except ValueError:
+        parser.error(f"--sizes must be comma-separated integers, got {args.sizes!r}")
+
+    pygame.init()
+    results = []
+    print(f"{'benchmark':38} {'size':>4} {'calls':>7} {'min us':>12} {'median us':>12}")
+    for size in sizes:
+        rng = random.Random(args.seed)
+        screen = pygame.display.set_mode(GameBoard(size, size, rng).size)
+        for name, function in cases(size, rng, screen):
+            if args.only and args.only not in name:
+                continue
+            calls, timings = measure(function, args.min_time, args.rounds)
+            result = {"name": name, "size": size, "calls": calls,
+                      "min_us": 1e6 * min(timings), "median_us": 1e6 * statistics.median(timings),
+                      "mean_us": 1e6 * statistics.fmean(timings)}
+            results.append(result)
+            print(f"{name:38} {size:>4} {calls:>7} {result['min_us']:>12.2f} {result['median_us']:>12.2f}")
+    pygame.quit()
+
+    if args.output:
+        machine = {"python": platform.python_version(), "pygame": pygame.version.ver,
+                   "platform": platform.platform(), "processor": platform.processor()}
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"machine": machine, "results": results}, file, indent=1)
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
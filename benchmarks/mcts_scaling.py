@@ -0,0 +1,39 @@
+"""
+    Reports MCTS playouts per second for each number of worker processes.
+    Usage: python -m benchmarks.mcts_scaling [--budget SECONDS] [--max-workers N] [--size N]
+"""
+import argparse
+import os
+import random
+
+from engine.game_state import GameState
+from engine.mcts import MonteCarloTreeSearch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCTS playouts/sec per worker count")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds of search per measurement")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count(), help="largest worker count")
+    parser.add_argument("--size", type=int, default=11, help="board size")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the position and of the playouts")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    state = GameState(args.size, args.size)
+    state.random_obstacles()
+
+    baseline = None
+    print(f"{'workers':>7} {'playouts':>9} {'playouts/s':>11} {'speedup':>8}")
+    workers = 1
+    while workers <= args.max_workers:
+        with MonteCarloTreeSearch(time_budget=args.budget, workers=workers, seed=args.seed) as search:
+            search(state)  # warm up the pool
+            search(state)
+            rate = search.last_playouts / search.last_elapsed
+        baseline = baseline or rate
+        print(f"{workers:>7} {search.last_playouts:>9} {rate:>11.0f} {rate / baseline:>8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
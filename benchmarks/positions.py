@@ -0,0 +1,48 @@
+"""
+    Generates a corpus of seeded starting positions and reports positions per second.
+    Usage: python -m benchmarks.positions [--count N] [--size N] [--obstacles N] [--min-distance N] [--escape]
+                                          [--output FILE]
+    With --output, the positions are written as game records without moves (see engine/record.py).
+"""
+import argparse
+import random
+import time
+
+from engine.bitboard import iter_bits
+from engine.positions import random_position
+from engine.record import GameRecord, check_encodable, write_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seeded starting positions per second")
+    parser.add_argument("--count", type=int, default=1000000, help="number of positions")
+    parser.add_argument("--size", type=int, default=11, help="board size")
+    parser.add_argument("--obstacles", type=int, default=5, help="number of obstacles per position")
+    parser.add_argument("--min-distance", type=int, default=0, help="moves the mouse needs at least to escape")
+    parser.add_argument("--escape", action="store_true", help="only positions where the mouse can escape")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the corpus")
+    parser.add_argument("--output", help="binary file the positions are written to")
+    args = parser.parse_args()
+    if args.output:
+        try:
+            check_encodable(args.size, args.size, range(args.seed, args.seed + 1))
+        except ValueError as error:
+            parser.error(f"--output: {error}")
+
+    rng = random.Random(args.seed)
+    output = open(args.output, "wb") if args.output else None
+    start = time.perf_counter()
+    for _ in range(args.count):
+        state = random_position(args.size, args.size, args.obstacles, rng,
+                                min_distance=args.min_distance, escape=args.escape)
+        if output is not None:
+            write_records(output, [GameRecord(args.seed, state.rows, state.cols, state.mouse,
+                                              list(iter_bits(state.obstacles)), [])])
+    elapsed = time.perf_counter() - start
+    if output is not None:
+        output.close()
+    print(f"{args.count} positions in {elapsed:.2f}s ({args.count / elapsed:.0f} positions/s)")
+
+
+if __name__ == "__main__":
+    main()
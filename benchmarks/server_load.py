@@ -0,0 +1,126 @@
+"""
+    Loads a match server on localhost with scripted clients: many idle matches, and games played to the end
+    by a random trapper and the hard mouse, every move checked by the server.
+    Usage: python -m benchmarks.server_load [--idle N] [--games N] [--size N]
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from engine.agents import random_trapper_move
+from engine.game_state import TRAPPER
+from engine.mouse_ai import hard_mouse_move
+from engine.protocol import encode, decode, parse_state
+from engine.server import MatchServer
+
+
+async def connect(address, *command):
+    """
+        Opens a connection and sends HOST or JOIN.
+        :param address: the (host, port) of the server
+        :param command: the command and its arguments
+        :return: (reader, writer, match id, role)
+    """
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(encode(*command))
+    words = decode(await reader.readline())
+    if words[0] != "MATCH":
+        raise RuntimeError(" ".join(words))
+    return reader, writer, int(words[1]), words[2]
+
+
+async def disconnect(connections):
+    """
+        Closes connections and lets the server notice before the event loop stops.
+        :param connections: the tuples returned by connect
+        :return: closes the connections
+    """
+    for _, writer, _, _ in connections:
+        writer.close()
+    await asyncio.gather(*(writer.wait_closed() for _, writer, _, _ in connections))
+    await asyncio.sleep(0.1)
+
+
+async def play(reader, writer, role, policy):
+    """
+        Plays one side until the game is over.
+        :param reader: the asyncio.StreamReader of the connection
+        :param writer: the asyncio.StreamWriter of the connection
+        :param role: the side played
+        :param policy: function that takes the GameState and returns the (row, col) to play
+        :return: the winner
+    """
+    while True:
+        words = decode(await reader.readline())
+        if not words or words[0] == "ERROR":
+            raise RuntimeError(" ".join(words) or "disconnected")
+        if words[0] == "WIN":
+            return words[1]
+        if words[0] == "STATE":
+            state = parse_state(words)
+            if (role == TRAPPER) == state.trapper_turn and not state.is_terminal():
+                writer.write(encode("MOVE", *policy(state)))
+
+
+async def scripted_game(address, size, rng):
+    """
+        Hosts a match and plays it with two scripted clients.
+        :param address: the (host, port) of the server
+        :param size: board size
+        :param rng: the random generator of the trapper
+        :return: the winner
+    """
+    trapper = await connect(address, "HOST", size, size)
+    mouse = await connect(address, "JOIN", trapper[2])
+    await trapper[0].readline()
+    winners = await asyncio.gather(
+        play(trapper[0], trapper[1], trapper[3], lambda state: random_trapper_move(state, rng)),
+        play(mouse[0], mouse[1], mouse[3], hard_mouse_move))
+    await disconnect([trapper, mouse])
+    return winners[0]
+
+
+async def run(args):
+    """
+        Starts the server, opens the idle matches and plays the games.
+        :param args: the parsed command line
+        :return: prints the memory per idle match and the games per second
+    """
+    server = MatchServer(seed=args.seed)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    address = await server.start()
+    idle = [await connect(address, "HOST", args.size, args.size) for _ in range(args.idle)]
+    await asyncio.sleep(0.1)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    server_files = [tracemalloc.Filter(True, "*engine*")]
+    grown = sum(stat.size_diff for stat in after.filter_traces(server_files).compare_to(
+        before.filter_traces(server_files), "filename"))
+    print(f"{len(server.matches)} idle matches, {grown / max(args.idle, 1):.0f} bytes of engine objects per match")
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    winners = await asyncio.gather(*(scripted_game(address, args.size, rng) for _ in range(args.games)))
+    elapsed = time.perf_counter() - start
+    counts = {winner: winners.count(winner) for winner in set(winners)}
+    print(f"{args.games} games in {elapsed:.2f}s while the matches idle, winners: {counts}")
+
+    await disconnect(idle)
+    await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match server under scripted clients")
+    parser.add_argument("--idle", type=int, default=2000, help="number of idle matches")
+    parser.add_argument("--games", type=int, default=100, help="number of games played to the end")
+    parser.add_argument("--size", type=int, default=11, help="board size")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the obstacles and of the trapper")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
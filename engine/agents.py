@@ -0,0 +1,107 @@
+"""
+    This module contains the agents that can play a side headlessly and the function that plays a game between two.
+    An agent is a callable that takes a GameState and returns the (row, col) cell to play.
+"""
+import random
+from functools import partial
+
+from engine.mcts import MonteCarloTreeSearch
+from engine.mouse_ai import easy_mouse_move, medium_mouse_move, hard_mouse_move, escape_mouse_move
+from engine.positions import random_position
+from engine.search import AlphaBetaSearch
+
+MAX_PLIES = 10000
+
+
+def random_trapper_move(state, rng=random):
+    """
+        Trapper that places obstacles on random free cells.
+        :param state: the GameState
+        :param rng: the random generator (a random.Random, or the random module)
+        :return: the (row, col) cell of the obstacle
+    """
+    return rng.choice(state.legal_trapper_moves())
+
+
+def make_alphabeta(argument, rng):
+    """
+        Builds an AlphaBetaSearch agent.
+        :param argument: time budget per move in seconds ("" for the default)
+        :param rng: unused, the search is deterministic
+        :return: the agent
+    """
+    return AlphaBetaSearch(float(argument) if argument else 0.05)
+
+
+def make_mcts(argument, rng):
+    """
+        Builds a MonteCarloTreeSearch agent.
+        :param argument: playouts per move ("1000") or time budget per move ("0.1s"), "" for the default
+        :param rng: the random generator that seeds the playouts
+        :return: the agent
+    """
+    if argument.endswith("s"):
+        return MonteCarloTreeSearch(time_budget=float(argument[:-1]), seed=rng.getrandbits(32))
+    return MonteCarloTreeSearch(playouts=int(argument or 1000), seed=rng.getrandbits(32))
+
+
+MOUSE_AGENTS = {
+    "easy": lambda argument, rng: partial(easy_mouse_move, rng=rng),
+    "medium": lambda argument, rng: partial(medium_mouse_move, rng=rng),
+    "hard": lambda argument, rng: hard_mouse_move,
+    "escape": lambda argument, rng: escape_mouse_move,
+    "alphabeta": make_alphabeta,
+    "mcts": make_mcts
+}
+TRAPPER_AGENTS = {
+    "random": lambda argument, rng: partial(random_trapper_move, rng=rng),
+    "alphabeta": make_alphabeta,
+    "mcts": make_mcts
+}
+
+
+def make_agent(spec, trapper, rng=random):
+    """
+        Builds an agent from its name and optional argument, e.g. "hard", "alphabeta:0.05" or "mcts:500".
+        :param spec: the agent specification
+        :param trapper: True for a trapper agent, False for a mouse agent
+        :param rng: the random generator of the agent
+        :return: the agent, raises ValueError if the name is unknown
+    """
+    name, _, argument = spec.partition(":")
+    agents = TRAPPER_AGENTS if trapper else MOUSE_AGENTS
+    if name not in agents:
+        raise ValueError(f"unknown {'trapper' if trapper else 'mouse'} agent {name!r}, "
+                         f"choose from {', '.join(agents)}")
+    return agents[name](argument, rng)
+
+
+def new_game(rows, cols, obstacles, rng=random, min_distance=0, escape=False):
+    """
+        Creates the starting position of a game.
+        :param rows: number of rows
+        :param cols: number of columns
+        :param obstacles: number of random obstacles
+        :param rng: the random generator of the obstacles
+        :param min_distance: the mouse needs at least this many moves to reach the edge
+        :param escape: if True, the mouse must have a path to the edge
+        :return: the GameState
+    """
+    return random_position(rows, cols, obstacles, rng, min_distance=min_distance, escape=escape)
+
+
+def play_game(state, trapper, mouse, max_plies=MAX_PLIES):
+    """
+        Plays a game to the end.
+        :param state: the starting GameState (modified in place)
+        :param trapper: the trapper agent
+        :param mouse: the mouse agent
+        :param max_plies: the game is stopped after this many moves
+        :return: the winner ("Mouse", "Trapper" or None if stopped)
+    """
+    plies = 0
+    while not state.is_terminal() and plies < max_plies:
+        agent = trapper if state.trapper_turn else mouse
+        state.apply_move(*agent(state))
+        plies += 1
+    return state.winner()
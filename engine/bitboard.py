@@ -0,0 +1,69 @@
+"""
+    This module contains the bitboard helpers: the hex neighbor offsets, iteration over set bits and random masks.
+"""
+import random
+from itertools import compress
+
+BITS = bytes.maketrans(b"01", b"\x00\x01")
+
+MOVES_ODD_ROW = [(0, 1), (0, -1), (-1, 0), (-1, 1), (1, 0), (1, 1)]
+MOVES_EVEN_ROW = [(0, 1), (0, -1), (-1, 0), (-1, -1), (1, 0), (1, -1)]
+
+
+def moves_for_row(row):
+    """
+        Returns the neighbor offsets for a row (odd rows are shifted to the right).
+        :param row: the row of the cell
+        :return: the list of (row, col) offsets of the neighbors
+    """
+    if row % 2 == 1:
+        return MOVES_ODD_ROW
+    return MOVES_EVEN_ROW
+
+
+def iter_bits(mask):
+    """
+        Iterates over the set bits of a bitboard, lowest first.
+        :param mask: the bitboard
+        :return: yields the index of every set bit
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def cell_bytes(mask, size):
+    """
+        Unpacks a bitboard into one byte per cell in one pass, so cells are tested by indexing instead of shifting
+        a large int; iterating over the bits of a large board is quadratic.
+        :param mask: the bitboard
+        :param size: number of cells
+        :return: bytes where cell i is 1 if its bit is set, 0 otherwise
+    """
+    return format(mask, f"0{size}b")[::-1].encode().translate(BITS)
+
+
+def set_cells(mask, size):
+    """
+        Lists the set bits of a bitboard in one pass, for bitboards with many bits where iter_bits is quadratic.
+        :param mask: the bitboard
+        :param size: number of cells
+        :return: the list of the indexes of the set bits, lowest first
+    """
+    return list(compress(range(size), cell_bytes(mask, size)))
+
+
+def random_mask(size, count, skip, rng=random):
+    """
+        Draws distinct cells without replacement in O(count), never drawing one cell.
+        :param size: number of cells of the board
+        :param count: number of cells to draw
+        :param skip: the cell index that is never drawn (the mouse)
+        :param rng: the random generator (a random.Random, or the random module)
+        :return: the bitboard of the drawn cells
+    """
+    mask = 0
+    for index in rng.sample(range(size - 1), count):
+        mask |= 1 << (index + (index >= skip))
+    return mask
@@ -0,0 +1,73 @@
+"""
+    This module contains the PositionCache class: a bounded least-recently-used map from position hashes to results.
+"""
+from collections import OrderedDict
+
+
+class PositionCache:
+    """
+        This class keeps the results of the last capacity positions looked up or stored. It counts its hits,
+        misses and evictions, so the capacity can be tuned from stats().
+    """
+
+    def __init__(self, capacity):
+        """
+            Initializes the PositionCache class.
+            :param capacity: the maximum number of entries
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        """
+            The number of entries.
+            :return: the number of cached positions
+        """
+        return len(self.entries)
+
+    def get(self, key):
+        """
+            Looks up a position and marks it as the most recently used.
+            :param key: the key of the position
+            :return: the cached result, None if the position is not cached
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+            Stores the result of a position, evicting the least recently used one when the cache is full.
+            :param key: the key of the position
+            :param value: the result, not None
+            :return: stores the result
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+            Drops every entry and resets the counters.
+            :return: empties the cache
+        """
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+            Returns the counters of the cache.
+            :return: a dict with the size, capacity, hits, misses, evictions and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {"size": len(self.entries), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,76 @@
+"""
+    This module contains the LineClient class, the client side of the network mode for programs with their own
+    frame loop.
+"""
+import queue
+import socket
+import threading
+
+from engine.protocol import encode, decode
+
+CONNECT_TIMEOUT = 5
+
+
+class LineClient:
+    """
+        This class connects to a MatchServer. A background thread reads the lines from the server into a queue,
+        so the caller can poll for messages between frames without blocking.
+    """
+
+    def __init__(self, host, port):
+        """
+            Initializes the LineClient class and connects.
+            :param host: the address of the server
+            :param port: the port of the server
+        """
+        self.socket = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT)
+        self.socket.settimeout(None)
+        self.messages = queue.Queue()
+        self.reader = threading.Thread(target=self.read, daemon=True)
+        self.reader.start()
+
+    def read(self):
+        """
+            Reads lines until the connection closes; the end is queued as an empty message.
+            :return: fills the queue
+        """
+        try:
+            with self.socket.makefile("rb") as lines:
+                for line in lines:
+                    words = decode(line)
+                    if words:
+                        self.messages.put(words)
+        except OSError:
+            pass
+        self.messages.put([])
+
+    def send(self, *words):
+        """
+            Sends a command.
+            :param words: the command and its arguments
+            :return: sends the line
+        """
+        self.socket.sendall(encode(*words))
+
+    def poll(self):
+        """
+            Returns the messages received since the last call.
+            :return: a list of messages, each a list of words; an empty message means the connection closed
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        """
+            Closes the connection.
+            :return: closes the socket
+        """
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
@@ -0,0 +1,185 @@
+"""
+    This module contains the BFS distances from the edges and the DistanceField class that repairs them incrementally.
+"""
+import heapq
+import weakref
+
+from engine.bitboard import cell_bytes, iter_bits
+
+INF = float('inf')
+MAX_CHANGES = 16
+
+
+def bfs_distances(state):
+    """
+        Calculates the distances from the edges using BFS, as a flat list indexed like the bitboards.
+        Every edge cell starts at 0, obstacles are never entered and cells next to the mouse are never expanded.
+        :param state: the GameState
+        :return: a list with the distance of every cell (inf if unreachable)
+    """
+    topology = state.topology
+    neighbor_cells = topology.neighbor_cells
+    near_mouse = neighbor_cells[state.mouse]
+    distances = [INF] * topology.size
+    seen = bytearray(cell_bytes(topology.border_mask | state.obstacles, topology.size))
+    frontier = list(topology.border_cells)
+    distance = 0
+    while frontier:
+        next_frontier = []
+        for index in frontier:
+            distances[index] = distance
+            if index in near_mouse:
+                continue
+            for neighbor in neighbor_cells[index]:
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+        distance += 1
+    return distances
+
+
+def bfs_distances_from_edges(state):
+    """
+        Calculates the distances from the edges to the mouse position using BFS
+        :param state: the GameState
+        :return: a matrix where each cell contains the distance from the edges
+    """
+    distances = bfs_distances(state)
+    cols = state.cols
+    return [distances[row * cols:(row + 1) * cols] for row in range(state.rows)]
+
+
+class DistanceField:
+    """
+        This class keeps the BFS distances of a game up to date.
+        The BFS is a shortest-path problem on a directed graph (u -> v if u is not next to the mouse and v is not
+        an obstacle), so a move only deletes or inserts a few edges: cells that lose their shortest-path parent
+        are found in order of distance and recomputed, and distances that shrink are relaxed Dijkstra-style.
+    """
+
+    def __init__(self, state):
+        """
+            Initializes the DistanceField class with a fresh BFS.
+            :param state: the GameState
+        """
+        self.rebuild(state)
+
+    def rebuild(self, state):
+        """
+            Recomputes the whole field.
+            :param state: the GameState
+            :return: recomputes the distances
+        """
+        self.rows = state.rows
+        self.cols = state.cols
+        self.topology = state.topology
+        self.obstacles = state.obstacles
+        self.mouse = state.mouse
+        self.distances = bfs_distances(state)
+
+    def matrix(self):
+        """
+            Returns the distances as a matrix, like bfs_distances_from_edges.
+            :return: a matrix where each cell contains the distance from the edges
+        """
+        cols = self.cols
+        return [self.distances[row * cols:(row + 1) * cols] for row in range(self.rows)]
+
+    def update(self, state):
+        """
+            Brings the field up to date with a state, repairing only the region the changes reach.
+            :param state: the GameState (obstacles may have been added or removed and the mouse moved)
+            :return: the flat list of distances
+        """
+        if state.rows != self.rows or state.cols != self.cols:
+            self.rebuild(state)
+            return self.distances
+        added = state.obstacles & ~self.obstacles
+        removed = self.obstacles & ~state.obstacles
+        if not added and not removed and state.mouse == self.mouse:
+            return self.distances
+        if (added | removed).bit_count() > MAX_CHANGES:
+            self.rebuild(state)
+            return self.distances
+
+        topology = self.topology
+        neighbor_cells = topology.neighbor_cells
+        border = topology.border_mask
+        obstacles = state.obstacles
+        old_mouse, mouse = self.mouse, state.mouse
+        near_mouse = neighbor_cells[mouse]
+        distances = self.distances
+        self.obstacles, self.mouse = obstacles, mouse
+
+        blocked = ()
+        unblocked = ()
+        if old_mouse != mouse:
+            blocked = set(near_mouse).difference(neighbor_cells[old_mouse])
+            unblocked = set(neighbor_cells[old_mouse]).difference(near_mouse)
+
+        # Edge deletions: new obstacles and the out-edges of cells that are now next to the mouse.
+        heap = [(distances[index], index) for index in iter_bits(added & ~border)]
+        for index in blocked:
+            child_distance = distances[index] + 1
+            for neighbor in neighbor_cells[index]:
+                if distances[neighbor] == child_distance and not border >> neighbor & 1:
+                    heap.append((child_distance, neighbor))
+        heapq.heapify(heap)
+        affected = set()
+        while heap:
+            distance, index = heapq.heappop(heap)
+            if index in affected or distance == INF:
+                continue
+            if not obstacles >> index & 1:
+                parent_distance = distance - 1
+                if any(distances[parent] == parent_distance and parent not in affected
+                       and parent not in near_mouse for parent in neighbor_cells[index]):
+                    continue
+            affected.add(index)
+            for neighbor in neighbor_cells[index]:
+                if (distances[neighbor] == distance + 1 and neighbor not in affected
+                        and not border >> neighbor & 1):
+                    heapq.heappush(heap, (distance + 1, neighbor))
+
+        # Seeds: affected cells and freed obstacles restart from their best parent, freed cells re-expand.
+        for index in affected:
+            distances[index] = INF
+        heap = []
+        for index in list(affected) + list(iter_bits(removed & ~border)):
+            if obstacles >> index & 1:
+                continue
+            best = min((distances[parent] for parent in neighbor_cells[index]
+                        if parent not in near_mouse), default=INF) + 1
+            if best < distances[index]:
+                distances[index] = best
+                heap.append((best, index))
+        for index in unblocked:
+            if distances[index] != INF:
+                heap.append((distances[index], index))
+        heapq.heapify(heap)
+        while heap:
+            distance, index = heapq.heappop(heap)
+            if distance != distances[index] or index in near_mouse:
+                continue
+            for neighbor in neighbor_cells[index]:
+                if distance + 1 < distances[neighbor] and not obstacles >> neighbor & 1:
+                    distances[neighbor] = distance + 1
+                    heapq.heappush(heap, (distance + 1, neighbor))
+        return distances
+
+
+_fields = weakref.WeakKeyDictionary()
+
+
+def distances_for(state):
+    """
+        Returns the distances of a state, kept up to date by a DistanceField attached to that state object.
+        :param state: the GameState
+        :return: the flat list of distances (shared, do not modify)
+    """
+    field = _fields.get(state)
+    if field is None:
+        field = _fields[state] = DistanceField(state)
+        return field.distances
+    return field.update(state)
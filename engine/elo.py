@@ -0,0 +1,177 @@
+"""
+    This module contains the statistics of the tournaments: Elo differences with confidence intervals, the
+    sequential probability ratio test (SPRT) that stops a pairing early, and Bradley-Terry ratings.
+"""
+import math
+
+ELO_SCALE = 400 / math.log(10)
+Z_95 = 1.959964
+
+
+def expected_score(elo):
+    """
+        Returns the expected score of a player that is elo points stronger than its opponent.
+        :param elo: the Elo difference
+        :return: the expected score, between 0 and 1
+    """
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_from_score(score):
+    """
+        Returns the Elo difference that gives an expected score.
+        :param score: the score, between 0 and 1
+        :return: the Elo difference, +-inf for a score of 1 or 0
+    """
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+class Score:
+    """
+        This class counts the wins, draws and losses of a player against one opponent.
+    """
+
+    def __init__(self):
+        """
+            Initializes the Score class.
+        """
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    @property
+    def games(self):
+        """
+            The number of games played.
+            :return: wins + draws + losses
+        """
+        return self.wins + self.draws + self.losses
+
+    @property
+    def points(self):
+        """
+            The points scored, a draw counting for half a point.
+            :return: the points
+        """
+        return self.wins + self.draws / 2
+
+    def add(self, result):
+        """
+            Counts a game.
+            :param result: 1 for a win, 0.5 for a draw, 0 for a loss
+            :return: updates the counts
+        """
+        if result == 1:
+            self.wins += 1
+        elif result == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def elo(self, z=Z_95):
+        """
+            Estimates the Elo difference with a normal confidence interval on the mean score.
+            :param z: the quantile of the interval (1.96 for 95%)
+            :return: (Elo difference, lower bound, upper bound)
+        """
+        n = self.games
+        if n == 0:
+            return 0.0, -math.inf, math.inf
+        mean = self.points / n
+        variance = (self.wins * (1 - mean) ** 2 + self.draws * (0.5 - mean) ** 2 + self.losses * mean ** 2) / n
+        margin = z * math.sqrt(variance / n)
+        return elo_from_score(mean), elo_from_score(mean - margin), elo_from_score(mean + margin)
+
+    def llr(self, elo0, elo1):
+        """
+            Returns the log-likelihood ratio of the hypothesis "the Elo difference is elo1" against "it is elo0";
+            a draw counts as half a win and half a loss.
+            :param elo0: the Elo difference of the null hypothesis
+            :param elo1: the Elo difference of the alternative hypothesis
+            :return: the log-likelihood ratio
+        """
+        score0, score1 = expected_score(elo0), expected_score(elo1)
+        return (self.points * math.log(score1 / score0)
+                + (self.games - self.points) * math.log((1 - score1) / (1 - score0)))
+
+
+def sprt_bounds(alpha=0.05, beta=0.05):
+    """
+        Returns the bounds of the log-likelihood ratio of an SPRT.
+        :param alpha: the probability of accepting the alternative hypothesis when the null one holds
+        :param beta: the probability of accepting the null hypothesis when the alternative one holds
+        :return: (lower bound, upper bound); the test accepts the null hypothesis below the lower one and the
+                 alternative one above the upper one
+    """
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def sprt(score, elo1, alpha=0.05, beta=0.05):
+    """
+        Tests whether one player is at least elo1 points stronger than the other: the hypotheses +elo1 and -elo1
+        are both tested against 0.
+        :param score: the Score of the first player
+        :param elo1: the Elo difference that counts as clearly stronger
+        :param alpha: the false positive rate of each test
+        :param beta: the false negative rate of each test
+        :return: 1 if the first player is stronger, -1 if the second one is, 0 if they are close, None to go on
+    """
+    lower, upper = sprt_bounds(alpha, beta)
+    stronger = score.llr(0, elo1)
+    weaker = score.llr(0, -elo1)
+    if stronger >= upper:
+        return 1
+    if weaker >= upper:
+        return -1
+    if stronger <= lower and weaker <= lower:
+        return 0
+    return None
+
+
+def bradley_terry(scores, players, iterations=1000, tolerance=1e-9, z=Z_95):
+    """
+        Fits Elo ratings to the results of a round robin with the Bradley-Terry model (minorization-maximization).
+        The ratings average 0; each interval comes from the Fisher information of the rating alone. Every player
+        gets one virtual draw spread over its opponents, so the ratings stay finite when a player wins every game.
+        :param scores: dict from (i, j) to the Score of player i against player j, one entry per pair
+        :param players: number of players
+        :param iterations: maximum number of iterations
+        :param tolerance: stops when no strength changes by more than this
+        :param z: the quantile of the intervals
+        :return: a list of (rating, margin) per player
+    """
+    points = [0.5] * players
+    games = [[0] * players for _ in range(players)]
+    for (i, j), score in scores.items():
+        points[i] += score.points
+        points[j] += score.games - score.points
+        games[i][j] += score.games
+        games[j][i] += score.games
+    for i in range(players):
+        for j in range(players):
+            if i != j:
+                games[i][j] += 1 / (players - 1)
+    strengths = [1.0] * players
+    for _ in range(iterations):
+        updated = []
+        for i in range(players):
+            denominator = sum(games[i][j] / (strengths[i] + strengths[j]) for j in range(players) if j != i)
+            updated.append(points[i] / denominator)
+        mean = math.exp(sum(math.log(strength) for strength in updated) / players)
+        updated = [strength / mean for strength in updated]
+        change = max(abs(new - old) for new, old in zip(updated, strengths))
+        strengths = updated
+        if change < tolerance:
+            break
+
+    ratings = []
+    for i in range(players):
+        information = sum(games[i][j] * strengths[i] * strengths[j] / (strengths[i] + strengths[j]) ** 2
+                          for j in range(players) if j != i)
+        margin = z * ELO_SCALE / math.sqrt(information) if information else math.inf
+        ratings.append((ELO_SCALE * math.log(strengths[i]), margin))
+    return ratings
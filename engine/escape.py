@@ -0,0 +1,357 @@
+"""
+    This module contains the escape evaluation: the vertex-disjoint paths from the mouse to the edge and the minimum
+    vertex cut that separates them, by max-flow on the hex graph.
+"""
+import math
+import weakref
+
+from engine.bitboard import cell_bytes, iter_bits
+
+NONE = -1
+SINK = -2
+MAX_CHANGES = 16
+ROUTE_WEIGHT = 2
+CUT_WEIGHT = 1
+MAX_COUNTED = 3
+
+
+class EscapeFlow:
+    """
+        This class keeps a maximum set of vertex-disjoint paths from the mouse to the edge: a max-flow where every
+        free cell has capacity 1 and paths end on the first edge cell they reach. By Menger's theorem, the number
+        of paths is also the size of the minimum vertex cut, the fewest cells the trapper must fill to enclose the
+        mouse, and the last search of the residual graph finds one such cut.
+        A cell carries at most one path: pred and succ link it to the previous and next cells of its path (SINK
+        after an edge cell). A move repairs the flow: paths through a new obstacle are dropped, paths still valid
+        from the new mouse cell are kept, and augmenting paths restore a maximum flow, so a move usually costs
+        one or two searches instead of one per path.
+        With levels, only the arcs from a level to the next one are used (see shortest_escape_paths). With a
+        limit, the augmentation stops at limit paths, which skips the last search over the whole region of the
+        mouse when only "at least limit" matters; cut is then only valid while value is below the limit.
+    """
+
+    def __init__(self, state, levels=None, limit=None):
+        """
+            Initializes the EscapeFlow class with a flow computed from scratch.
+            :param state: the GameState
+            :param levels: optional list of the level of every cell, -1 for cells that are never entered
+            :param limit: optional number of paths after which the augmentation stops
+        """
+        self.levels = levels
+        self.limit = limit
+        self.rebuild(state)
+
+    def rebuild(self, state):
+        """
+            Recomputes the whole flow.
+            :param state: the GameState
+            :return: recomputes the paths and the cut
+        """
+        self.rows = state.rows
+        self.cols = state.cols
+        self.topology = state.topology
+        self.border = cell_bytes(self.topology.border_mask, self.topology.size)
+        self.obstacles = state.obstacles
+        self.blocked = cell_bytes(state.obstacles, self.topology.size)
+        self.mouse = state.mouse
+        self.pred = [NONE] * self.topology.size
+        self.succ = [NONE] * self.topology.size
+        self.value = 0
+        self.reached = []
+        self.parent = None
+        self.saturate()
+
+    def saturate(self):
+        """
+            Augments the flow until no augmenting path is left.
+            :return: updates the paths, value and the reached nodes of the last search
+        """
+        while (self.limit is None or self.value < self.limit) and self.augment():
+            self.value += 1
+
+    def augment(self):
+        """
+            Searches the residual graph breadth-first for a path from the mouse to the edge and applies it.
+            Every cell is split into an entry node (2 * cell) and an exit node (2 * cell + 1): entry to exit is
+            free while no path uses the cell, and exit to entry takes a path out of it. Only cells have a capacity,
+            so an arc from an exit to the next entry is always free, and a path can be rerouted backwards along its
+            own arcs.
+            :return: True if the flow grew, False if it is maximum (reached then holds the nodes searched)
+        """
+        neighbor_cells = self.topology.neighbor_cells
+        blocked, border, levels = self.blocked, self.border, self.levels
+        pred, succ = self.pred, self.succ
+        mouse = self.mouse
+        start = 2 * mouse + 1
+        parent = [NONE] * (2 * self.topology.size)
+        parent[start] = start
+        queue = [start]
+        end = None
+        for node in queue:
+            cell = node >> 1
+            if node & 1:
+                if cell != mouse and border[cell]:
+                    if succ[cell] == NONE:
+                        end = node
+                        break
+                else:
+                    level = None if levels is None else levels[cell] + 1
+                    for neighbor in neighbor_cells[cell]:
+                        entry = 2 * neighbor
+                        if ((level is not None and levels[neighbor] != level) or parent[entry] != NONE
+                                or blocked[neighbor] or neighbor == mouse):
+                            continue
+                        parent[entry] = node
+                        queue.append(entry)
+                if cell != mouse and pred[cell] != NONE and parent[node - 1] == NONE:
+                    parent[node - 1] = node
+                    queue.append(node - 1)
+            else:
+                back = node + 1 if pred[cell] == NONE else 2 * pred[cell] + 1
+                if parent[back] == NONE:
+                    parent[back] = node
+                    queue.append(back)
+        self.reached = queue
+        self.parent = parent
+        if end is None:
+            return False
+
+        path = [end]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        path.reverse()
+        for first, second in zip(path, path[1:]):
+            if first >> 1 == second >> 1:
+                continue
+            if first & 1:
+                source, target = first >> 1, second >> 1
+                if source != mouse:
+                    succ[source] = target
+                pred[target] = source
+            else:
+                target, source = first >> 1, second >> 1
+                if pred[target] == source:
+                    pred[target] = NONE
+                if succ[source] == target:
+                    succ[source] = NONE
+        succ[end >> 1] = SINK
+        return True
+
+    def drop_path(self, cell):
+        """
+            Removes the path (or the loop) that goes through a cell.
+            :param cell: a cell used by the flow
+            :return: frees the cells of the path
+        """
+        pred, succ, mouse = self.pred, self.succ, self.mouse
+        previous = pred[cell]
+        current = cell
+        while current not in (NONE, SINK, mouse):
+            following = succ[current]
+            pred[current] = succ[current] = NONE
+            current = following
+        current = previous
+        while current not in (NONE, SINK, mouse):
+            previous = pred[current]
+            pred[current] = succ[current] = NONE
+            current = previous
+        if current == mouse:
+            self.value -= 1
+
+    def copy(self, limit=None):
+        """
+            Copies the flow, so it can be repaired for another position without touching this one.
+            :param limit: the limit of the copy
+            :return: a new EscapeFlow with the same paths
+        """
+        flow = EscapeFlow.__new__(EscapeFlow)
+        flow.__dict__.update(self.__dict__)
+        flow.limit = limit
+        flow.pred = list(self.pred)
+        flow.succ = list(self.succ)
+        return flow
+
+    def path_from(self, first):
+        """
+            Follows a path from its first cell.
+            :param first: a neighbor of the mouse whose predecessor is the mouse
+            :return: the list of the cells of the path, from the mouse's neighbor to the edge
+        """
+        path = [first]
+        while self.succ[path[-1]] not in (NONE, SINK):
+            path.append(self.succ[path[-1]])
+        return path
+
+    def paths(self):
+        """
+            Returns the vertex-disjoint escape paths of the flow.
+            :return: a list of paths, each a list of cell indexes from a neighbor of the mouse to the edge
+        """
+        return [self.path_from(cell) for cell in self.topology.neighbor_cells[self.mouse]
+                if self.pred[cell] == self.mouse]
+
+    def cut(self):
+        """
+            Returns a minimum vertex cut: the cells whose entry the last search reached but not their exit.
+            :return: the bitboard of the cut cells, as many as value
+        """
+        mask = 0
+        for node in self.reached:
+            if not node & 1 and self.parent[node + 1] == NONE:
+                mask |= 1 << (node >> 1)
+        return mask
+
+    def reroot(self, mouse):
+        """
+            Moves the source of the flow to a neighbor of the old mouse cell: the rest of a path through the new
+            cell and the paths whose first cell is also next to the new cell are kept, the others are dropped.
+            :param mouse: the new mouse cell, next to the old one
+            :return: updates the paths
+        """
+        pred, succ = self.pred, self.succ
+        old = self.mouse
+        neighbors = self.topology.neighbor_cells[mouse]
+        tail = NONE
+        if pred[mouse] != NONE:
+            tail = succ[mouse]
+            current = pred[mouse]
+            pred[mouse] = succ[mouse] = NONE
+            while current not in (NONE, old, mouse):
+                previous = pred[current]
+                pred[current] = succ[current] = NONE
+                current = previous
+            if current == mouse:
+                tail = NONE
+        for first in self.topology.neighbor_cells[old]:
+            if pred[first] == old:
+                if first in neighbors:
+                    pred[first] = mouse
+                else:
+                    self.drop_path(first)
+        self.mouse = mouse
+        if tail >= 0:
+            pred[tail] = mouse
+        self.value = sum(pred[cell] == mouse for cell in neighbors)
+
+    def update(self, state):
+        """
+            Brings the flow up to date with a state, repairing it when the changes allow it.
+            :param state: the GameState (obstacles may have been added or removed and the mouse moved)
+            :return: the EscapeFlow
+        """
+        if self.levels is not None or state.rows != self.rows or state.cols != self.cols:
+            self.rebuild(state)
+            return self
+        added = state.obstacles & ~self.obstacles
+        removed = self.obstacles & ~state.obstacles
+        moved = state.mouse != self.mouse
+        if not added and not removed and not moved:
+            return self
+        if ((added | removed).bit_count() > MAX_CHANGES
+                or moved and state.mouse not in self.topology.neighbor_cells[self.mouse]):
+            self.rebuild(state)
+            return self
+        self.obstacles = state.obstacles
+        self.blocked = cell_bytes(state.obstacles, self.topology.size)
+        for cell in iter_bits(added):
+            if self.pred[cell] != NONE:
+                self.drop_path(cell)
+        if moved:
+            self.reroot(state.mouse)
+        self.saturate()
+        return self
+
+
+_flows = weakref.WeakKeyDictionary()
+
+
+def escape_flow(state):
+    """
+        Returns the escape flow of a state, kept up to date by an EscapeFlow attached to that state object.
+        :param state: the GameState
+        :return: the EscapeFlow (shared, do not modify)
+    """
+    flow = _flows.get(state)
+    if flow is None:
+        flow = _flows[state] = EscapeFlow(state)
+        return flow
+    return flow.update(state)
+
+
+def escape_levels(state):
+    """
+        Numbers the cells by their distance from the mouse and keeps only those on a shortest escape path.
+        :param state: the GameState
+        :return: (distance to the edge, list of levels with -1 for cells on no shortest path), distance None if
+                 the mouse is enclosed
+    """
+    topology = state.topology
+    neighbor_cells = topology.neighbor_cells
+    size = topology.size
+    blocked = cell_bytes(state.obstacles, size)
+    border = cell_bytes(topology.border_mask, size)
+    levels = [-1] * size
+    levels[state.mouse] = 0
+    layers = [[state.mouse]]
+    exits = []
+    while layers[-1] and not exits:
+        layer = []
+        for cell in layers[-1]:
+            for neighbor in neighbor_cells[cell]:
+                if levels[neighbor] < 0 and not blocked[neighbor]:
+                    levels[neighbor] = len(layers)
+                    layer.append(neighbor)
+                    if border[neighbor]:
+                        exits.append(neighbor)
+        layers.append(layer)
+    if not exits:
+        return None, None
+    distance = len(layers) - 1
+    on_path = bytearray(size)
+    for cell in exits:
+        on_path[cell] = 1
+    for level in range(distance, 1, -1):
+        for cell in layers[level]:
+            if on_path[cell]:
+                for neighbor in neighbor_cells[cell]:
+                    if levels[neighbor] == level - 1:
+                        on_path[neighbor] = 1
+    for level in range(1, distance + 1):
+        for cell in layers[level]:
+            if not on_path[cell]:
+                levels[cell] = -1
+    return distance, levels
+
+
+def shortest_escape_paths(state, limit=None):
+    """
+        Counts the vertex-disjoint shortest escape paths: a max-flow on the arcs that go one step further from the
+        mouse on a shortest path to the edge.
+        :param state: the GameState
+        :param limit: optional number of paths after which the count stops
+        :return: (distance to the edge, number of disjoint shortest paths), (None, 0) if the mouse is enclosed
+    """
+    distance, levels = escape_levels(state)
+    if distance is None:
+        return None, 0
+    return distance, EscapeFlow(state, levels, limit).value
+
+
+def evaluate_escape(state, flow=None):
+    """
+        Scores a position for the mouse: shorter escapes are better, and so are escapes along several disjoint
+        shortest paths or behind a wide cut, which the trapper cannot close with one obstacle.
+        :param state: the GameState, the mouse on the cell to evaluate
+        :param flow: optional EscapeFlow of the state, at least MAX_COUNTED paths or saturated
+        :return: the score, higher is better for the mouse (inf on the edge); None if the mouse is enclosed
+    """
+    if state.topology.border_mask >> state.mouse & 1:
+        return math.inf
+    distance, routes = shortest_escape_paths(state, MAX_COUNTED)
+    if distance is None:
+        return None
+    if flow is None:
+        cut = EscapeFlow(state, limit=MAX_COUNTED).value
+    else:
+        cut = min(flow.value, MAX_COUNTED)
+    return ROUTE_WEIGHT * routes + CUT_WEIGHT * cut - distance
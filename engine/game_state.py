@@ -0,0 +1,349 @@
+"""
+    This module contains the GameState class, the pygame-free core of the game.
+"""
+import random
+
+from engine.bitboard import iter_bits, random_mask, set_cells
+from engine.topology import get_topology
+from engine.zobrist import zobrist_keys
+
+MOUSE = "Mouse"
+TRAPPER = "Trapper"
+MAX_REHASH_CHANGES = 64
+
+
+class GameState:
+    """
+        This class represents the state of a game: obstacles, mouse position and whose turn it is.
+        Obstacles are a bitboard (bit row * cols + col) and the mouse is a cell index.
+        The Zobrist hash of the obstacles and the mouse cell is computed on the first position_hash call and then
+        kept up to date by the moves; hashed holds the (obstacles, mouse) it was computed for.
+    """
+
+    def __init__(self, rows, cols, start=None):
+        """
+            Initializes the GameState class.
+            :param rows: number of rows
+            :param cols: number of columns
+            :param start: the (row, col) cell of the mouse at the start, None for the center of the board
+        """
+        self.rows = rows
+        self.cols = cols
+        self.topology = get_topology(rows, cols)
+        self.obstacles = 0
+        if start is None:
+            start = (rows // 2, cols // 2)
+        if not self.topology.in_bounds(*start):
+            raise ValueError(f"start cell {start} is not on the board")
+        self.mouse = start[0] * cols + start[1]
+        self.trapper_turn = True
+        self.history = []
+        self.hash_value = 0
+        self.hashed = None
+
+    def copy(self):
+        """
+            Copies the state.
+            :return: a new GameState with the same obstacles, mouse position and turn
+        """
+        state = GameState(self.rows, self.cols)
+        state.copy_from(self)
+        return state
+
+    def copy_from(self, state):
+        """
+            Takes the position of another state of the same size. Unlike copy, this object is kept, so the
+            distances attached to it (see distances_for) are repaired for the new position instead of recomputed.
+            :param state: the GameState to copy
+            :return: sets the obstacles, mouse position, turn, history and hash
+        """
+        self.obstacles = state.obstacles
+        self.mouse = state.mouse
+        self.trapper_turn = state.trapper_turn
+        self.history = list(state.history)
+        self.hash_value = state.hash_value
+        self.hashed = state.hashed
+
+    def position_hash(self):
+        """
+            Returns the Zobrist hash of the obstacles and the mouse cell; the side to move is not hashed, the
+            distances and the best move of the mouse do not depend on it. When the obstacles or the mouse were
+            set directly rather than by a move, only the cells that changed are hashed again.
+            :return: the 64-bit hash
+        """
+        position = (self.obstacles, self.mouse)
+        if self.hashed == position:
+            return self.hash_value
+        keys = zobrist_keys(self.rows, self.cols)
+        if self.hashed is None or (self.hashed[0] ^ self.obstacles).bit_count() > MAX_REHASH_CHANGES:
+            self.hash_value = keys.hash(self.obstacles, self.mouse, True)
+        else:
+            obstacles, mouse = self.hashed
+            for index in iter_bits(obstacles ^ self.obstacles):
+                self.hash_value ^= keys.obstacle[index]
+            self.hash_value ^= keys.mouse[mouse] ^ keys.mouse[self.mouse]
+        self.hashed = position
+        return self.hash_value
+
+    def move_hash(self, obstacle=None, mouse=None):
+        """
+            Updates the hash with a move about to be played or undone, if the hash is in sync with the state.
+            :param obstacle: the cell index of an obstacle placed or removed
+            :param mouse: the cell index the mouse moves to
+            :return: updates hash_value and hashed
+        """
+        if self.hashed != (self.obstacles, self.mouse):
+            return
+        keys = zobrist_keys(self.rows, self.cols)
+        obstacles = self.obstacles
+        if obstacle is not None:
+            self.hash_value ^= keys.obstacle[obstacle]
+            obstacles ^= 1 << obstacle
+        if mouse is not None:
+            self.hash_value ^= keys.mouse[self.mouse] ^ keys.mouse[mouse]
+        self.hashed = (obstacles, self.mouse if mouse is None else mouse)
+
+    def key(self):
+        """
+            Returns a hashable key of the position.
+            :return: a tuple (obstacles, mouse, trapper_turn)
+        """
+        return self.obstacles, self.mouse, self.trapper_turn
+
+    def index(self, row, col):
+        """
+            Converts a cell to its bit index.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: the bit index of the cell
+        """
+        return row * self.cols + col
+
+    def cell(self, index):
+        """
+            Converts a bit index to its cell.
+            :param index: the bit index
+            :return: the (row, col) cell
+        """
+        return divmod(index, self.cols)
+
+    @property
+    def mouse_position(self):
+        """
+            The cell of the mouse.
+            :return: the (row, col) of the mouse
+        """
+        return divmod(self.mouse, self.cols)
+
+    @property
+    def obstacle_cells(self):
+        """
+            The cells of the obstacles.
+            :return: a list of (row, col) cells
+        """
+        return [divmod(index, self.cols) for index in set_cells(self.obstacles, self.topology.size)]
+
+    def in_bounds(self, row, col):
+        """
+            Checks if a cell is on the board.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: True if the cell is on the board, False otherwise
+        """
+        return self.topology.in_bounds(row, col)
+
+    def is_border(self, row, col):
+        """
+            Checks if a cell is on the edge of the board.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: True if the cell is on the edge, False otherwise
+        """
+        return self.topology.is_border(row * self.cols + col)
+
+    def is_obstacle(self, row, col):
+        """
+            Checks if a cell is an obstacle.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: True if the cell is an obstacle, False otherwise
+        """
+        return self.obstacles >> (row * self.cols + col) & 1 == 1
+
+    def is_free(self, row, col):
+        """
+            Checks if a cell is neither an obstacle nor the mouse.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: True if the cell is free, False otherwise
+        """
+        return not (self.obstacles | 1 << self.mouse) >> (row * self.cols + col) & 1
+
+    def neighbors(self, row, col):
+        """
+            Returns the neighbors of a cell that are on the board.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: a list of (row, col) neighbors
+        """
+        cols = self.cols
+        return [divmod(index, cols) for index in self.topology.neighbor_cells[row * cols + col]]
+
+    def legal_mouse_mask(self):
+        """
+            Returns the cells the mouse can move to as a bitboard.
+            :return: the bitboard of the free neighbors of the mouse
+        """
+        return self.topology.dilate(1 << self.mouse) & ~(self.obstacles | 1 << self.mouse)
+
+    def legal_mouse_moves(self):
+        """
+            Returns the cells the mouse can move to.
+            :return: a list of (row, col) cells, in the order of the neighbor offsets
+        """
+        obstacles, cols = self.obstacles, self.cols
+        return [divmod(index, cols) for index in self.topology.neighbor_cells[self.mouse]
+                if not obstacles >> index & 1]
+
+    def legal_trapper_moves(self):
+        """
+            Returns the cells where the trapper can place an obstacle.
+            :return: a list of (row, col) cells
+        """
+        free = self.topology.full_mask & ~(self.obstacles | 1 << self.mouse)
+        return [divmod(index, self.cols) for index in set_cells(free, self.topology.size)]
+
+    def is_legal_mouse_move(self, row, col):
+        """
+            Checks if the mouse can move to a cell.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: True if the move is legal, False otherwise
+        """
+        index = row * self.cols + col
+        return (not self.trapper_turn and self.in_bounds(row, col) and self.winner() is None
+                and index in self.topology.neighbor_cells[self.mouse] and not self.obstacles >> index & 1)
+
+    def is_legal_trapper_move(self, row, col):
+        """
+            Checks if the trapper can place an obstacle on a cell.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: True if the move is legal, False otherwise
+        """
+        return (self.trapper_turn and self.in_bounds(row, col) and self.winner() is None
+                and self.is_free(row, col))
+
+    def apply_trapper_move(self, row, col):
+        """
+            Places an obstacle and gives the turn to the mouse.
+            :param row: row of the obstacle
+            :param col: column of the obstacle
+            :return: places the obstacle, raises ValueError if the move is illegal
+        """
+        if not self.is_legal_trapper_move(row, col):
+            raise ValueError(f"illegal trapper move {(row, col)}")
+        index = row * self.cols + col
+        self.move_hash(obstacle=index)
+        self.obstacles |= 1 << index
+        self.history.append((TRAPPER, index))
+        self.trapper_turn = False
+
+    def apply_mouse_move(self, row, col):
+        """
+            Moves the mouse and gives the turn to the trapper.
+            :param row: row of the new mouse position
+            :param col: column of the new mouse position
+            :return: moves the mouse, raises ValueError if the move is illegal
+        """
+        if not self.is_legal_mouse_move(row, col):
+            raise ValueError(f"illegal mouse move {(row, col)}")
+        self.history.append((MOUSE, self.mouse))
+        self.move_hash(mouse=row * self.cols + col)
+        self.mouse = row * self.cols + col
+        self.trapper_turn = True
+
+    def moves(self):
+        """
+            Returns the cells played so far, rebuilt from the history.
+            :return: a list with the cell index of every move, trapper first
+        """
+        moves = []
+        last_mouse = None
+        for player, index in self.history:
+            if player == TRAPPER:
+                moves.append(index)
+            else:
+                if last_mouse is not None:
+                    moves[last_mouse] = index
+                last_mouse = len(moves)
+                moves.append(None)
+        if last_mouse is not None:
+            moves[last_mouse] = self.mouse
+        return moves
+
+    def apply_move(self, row, col):
+        """
+            Plays a move for the side whose turn it is.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: plays the move
+        """
+        if self.trapper_turn:
+            self.apply_trapper_move(row, col)
+        else:
+            self.apply_mouse_move(row, col)
+
+    def undo(self):
+        """
+            Takes back the last move.
+            :return: restores the state before the last move
+        """
+        player, index = self.history.pop()
+        if player == TRAPPER:
+            self.move_hash(obstacle=index)
+            self.obstacles &= ~(1 << index)
+            self.trapper_turn = True
+        else:
+            self.move_hash(mouse=index)
+            self.mouse = index
+            self.trapper_turn = False
+
+    def winner(self):
+        """
+            Checks if the trapper or the mouse won.
+            :return: "Mouse" if the mouse reached the edge, "Trapper" if the mouse is surrounded, None otherwise
+        """
+        if self.topology.border_mask >> self.mouse & 1:
+            return MOUSE
+        obstacles = self.obstacles
+        if all(obstacles >> index & 1 for index in self.topology.neighbor_cells[self.mouse]):
+            return TRAPPER
+        return None
+
+    def is_terminal(self):
+        """
+            Checks if the game is over.
+            :return: True if someone won, False otherwise
+        """
+        return self.winner() is not None
+
+    def random_obstacles(self, minimum=3, maximum=7, rng=random):
+        """
+            Adds random obstacles on free cells (never on the mouse), drawn without replacement.
+            :param minimum: minimum number of obstacles
+            :param maximum: maximum number of obstacles
+            :param rng: the random generator (a random.Random, or the random module)
+            :return: sets random obstacles on the board, raises ValueError if there are not enough free cells
+        """
+        n = rng.randint(minimum, maximum)
+        if not self.obstacles:
+            if n >= self.topology.size:
+                raise ValueError(f"cannot place {n} obstacles on {self.topology.size} cells")
+            self.obstacles = random_mask(self.topology.size, n, self.mouse, rng)
+            return
+        free = set_cells(self.topology.full_mask & ~(self.obstacles | 1 << self.mouse), self.topology.size)
+        if n > len(free):
+            raise ValueError(f"cannot place {n} obstacles on {len(free)} free cells")
+        for index in rng.sample(free, n):
+            self.obstacles |= 1 << index
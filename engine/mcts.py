@@ -0,0 +1,238 @@
+"""
+    This module contains the MonteCarloTreeSearch class: UCT for the trapper and the mouse, parallelized at the root.
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine.bitboard import iter_bits
+from engine.topology import get_topology
+
+MAX_ROLLOUT_PLIES = 400
+
+
+class Node:
+    """
+        This class represents a node of the search tree.
+        wins counts the playouts won by the side that moved into the node.
+    """
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, parent, untried):
+        """
+            Initializes the Node class.
+            :param move: cell index of the move that leads to the node (None for the root)
+            :param parent: the parent Node
+            :param untried: cell indexes of the moves not expanded yet
+        """
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0
+
+
+def candidate_moves(topology, obstacles, mouse, trapper_turn):
+    """
+        Returns the moves the tree expands: the free neighbors of the mouse for the mouse, and the free cells at
+        distance 1 or 2 of the mouse for the trapper.
+        :param topology: the Topology
+        :param obstacles: the obstacle bitboard
+        :param mouse: the cell index of the mouse
+        :param trapper_turn: True if the trapper is to move
+        :return: a list of cell indexes
+    """
+    neighbor_cells = topology.neighbor_cells
+    if not trapper_turn:
+        return [index for index in neighbor_cells[mouse] if not obstacles >> index & 1]
+    area = topology.dilate(topology.dilate(1 << mouse)) & ~(obstacles | 1 << mouse)
+    return list(iter_bits(area))
+
+
+def mouse_won(topology, obstacles, mouse):
+    """
+        Checks if a position is over.
+        :param topology: the Topology
+        :param obstacles: the obstacle bitboard
+        :param mouse: the cell index of the mouse
+        :return: True if the mouse won, False if the trapper won, None if the game goes on
+    """
+    if topology.border_mask >> mouse & 1:
+        return True
+    if all(obstacles >> index & 1 for index in topology.neighbor_cells[mouse]):
+        return False
+    return None
+
+
+def rollout(topology, obstacles, mouse, trapper_turn, rng):
+    """
+        Plays a position to the end: the mouse moves like random_move and the trapper blocks a random free
+        neighbor of the mouse.
+        :param topology: the Topology
+        :param obstacles: the obstacle bitboard
+        :param mouse: the cell index of the mouse
+        :param trapper_turn: True if the trapper is to move
+        :param rng: the random.Random of the worker
+        :return: True if the mouse won, False otherwise
+    """
+    neighbor_cells = topology.neighbor_cells
+    for _ in range(MAX_ROLLOUT_PLIES):
+        result = mouse_won(topology, obstacles, mouse)
+        if result is not None:
+            return result
+        free = [index for index in neighbor_cells[mouse] if not obstacles >> index & 1]
+        if trapper_turn:
+            obstacles |= 1 << rng.choice(free)
+        else:
+            mouse = rng.choice(free)
+        trapper_turn = not trapper_turn
+    return True
+
+
+def search(rows, cols, obstacles, mouse, trapper_turn, playouts, time_budget, exploration, seed):
+    """
+        Runs one UCT search from a position. This is the unit of work of a worker process.
+        :param rows: number of rows
+        :param cols: number of columns
+        :param obstacles: the obstacle bitboard
+        :param mouse: the cell index of the mouse
+        :param trapper_turn: True if the trapper is to move
+        :param playouts: number of playouts, or None to use the time budget
+        :param time_budget: seconds to search when playouts is None
+        :param exploration: the UCT exploration constant
+        :param seed: seed of the worker's random generator
+        :return: (stats, playouts) where stats maps each root move to (visits, wins)
+    """
+    rng = random.Random(seed)
+    topology = get_topology(rows, cols)
+    root = Node(None, None, candidate_moves(topology, obstacles, mouse, trapper_turn))
+    deadline = time.perf_counter() + (time_budget or 0)
+    done = 0
+    while (done < playouts) if playouts is not None else (time.perf_counter() < deadline):
+        node, node_obstacles, node_mouse, node_turn = root, obstacles, mouse, trapper_turn
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+            if node_turn:
+                node_obstacles |= 1 << node.move
+            else:
+                node_mouse = node.move
+            node_turn = not node_turn
+        result = mouse_won(topology, node_obstacles, node_mouse)
+        if result is None and node.untried:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            if node_turn:
+                node_obstacles |= 1 << move
+            else:
+                node_mouse = move
+            node_turn = not node_turn
+            child = Node(move, node, candidate_moves(topology, node_obstacles, node_mouse, node_turn))
+            node.children.append(child)
+            node = child
+            result = mouse_won(topology, node_obstacles, node_mouse)
+        if result is None:
+            result = rollout(topology, node_obstacles, node_mouse, node_turn, rng)
+        # The side that moved into a node is the trapper when the mouse is to move in it.
+        mover_is_trapper = not node_turn
+        while node is not None:
+            node.visits += 1
+            if result != mover_is_trapper:
+                node.wins += 1
+            mover_is_trapper = not mover_is_trapper
+            node = node.parent
+        done += 1
+    return {child.move: (child.visits, child.wins) for child in root.children}, done
+
+
+class MonteCarloTreeSearch:
+    """
+        This class chooses moves with Monte Carlo Tree Search (UCT). With several workers, each process searches
+        its own tree from the root and the visit counts of the root moves are summed (root parallelization).
+        An instance can be called like a policy; call close() to stop the worker processes.
+    """
+
+    def __init__(self, playouts=None, time_budget=0.1, workers=1, exploration=1.4, seed=None):
+        """
+            Initializes the MonteCarloTreeSearch class.
+            :param playouts: total number of playouts per move, or None to use the time budget
+            :param time_budget: seconds per move when playouts is None
+            :param workers: number of processes
+            :param exploration: the UCT exploration constant
+            :param seed: seed of the playouts, None for a random one
+        """
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self.workers = workers
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.executor = None
+        self.last_playouts = 0
+        self.last_elapsed = 0
+
+    def __call__(self, state):
+        """
+            Chooses a move, so the search can be used as a policy.
+            :param state: the GameState
+            :return: the (row, col) cell to play
+        """
+        return self.best_move(state)
+
+    def __enter__(self):
+        """
+            Uses the search as a context manager that closes the pool on exit.
+            :return: the search
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+            Closes the pool.
+            :param exc_info: the exception, if any
+            :return: closes the pool
+        """
+        self.close()
+
+    def close(self):
+        """
+            Shuts down the worker processes.
+            :return: stops the pool
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def best_move(self, state):
+        """
+            Searches a position and returns the most visited root move.
+            :param state: the GameState (not modified)
+            :return: the (row, col) cell to play for the side to move
+        """
+        start = time.perf_counter()
+        jobs = []
+        for worker in range(self.workers):
+            playouts = None
+            if self.playouts is not None:
+                playouts = self.playouts // self.workers + (worker < self.playouts % self.workers)
+            jobs.append((state.rows, state.cols, state.obstacles, state.mouse, state.trapper_turn, playouts,
+                         self.time_budget, self.exploration, self.rng.getrandbits(32)))
+        if self.workers == 1:
+            results = [search(*jobs[0])]
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            results = list(self.executor.map(search, *zip(*jobs)))
+
+        visits = {}
+        self.last_playouts = 0
+        for stats, done in results:
+            self.last_playouts += done
+            for move, (move_visits, _) in stats.items():
+                visits[move] = visits.get(move, 0) + move_visits
+        self.last_elapsed = time.perf_counter() - start
+        if not visits:
+            return state.cell(candidate_moves(state.topology, state.obstacles, state.mouse, state.trapper_turn)[0])
+        return state.cell(max(visits, key=visits.get))
@@ -0,0 +1,142 @@
+"""
+    This module contains the mouse AI: the best and random moves and the easy, medium and hard policies.
+"""
+import random
+
+from engine.cache import PositionCache
+from engine.distances import distances_for
+from engine.escape import escape_flow, evaluate_escape, MAX_COUNTED
+from engine.tablebase import probe
+
+BEST_MOVE_CACHE_SIZE = 4096
+
+best_move_cache = PositionCache(BEST_MOVE_CACHE_SIZE)
+
+
+def choose_best_move(state, cache=best_move_cache):
+    """
+        Calculates the best move: a forced escape from the tablebase when there is one, otherwise the move
+        based on distance to edge. Moves are cached by position hash, so a position seen again (after a reset
+        with the same seed, in a replay, in another game of a tournament) costs one lookup.
+        :param state: the GameState
+        :param cache: the PositionCache of the moves, None to always compute the move
+        :return: the (row, col) cell the mouse should move to, None if the mouse cannot move
+    """
+    if cache is None:
+        return compute_best_move(state)
+    key = (state.rows, state.cols, state.position_hash())
+    move = cache.get(key)
+    if move is None:
+        move = compute_best_move(state)
+        if move is not None:
+            cache.put(key, move)
+    return move
+
+
+def compute_best_move(state):
+    """
+        Calculates the best move without the cache.
+        :param state: the GameState
+        :return: the (row, col) cell the mouse should move to, None if the mouse cannot move
+    """
+    solved = probe(state)
+    if solved is not None:
+        return solved[1]
+    best_move = None
+    best_distance = float('inf')
+    distances = distances_for(state)
+    obstacles = state.obstacles
+    for index in state.topology.neighbor_cells[state.mouse]:
+        if not obstacles >> index & 1 and distances[index] <= best_distance:
+            best_distance = distances[index]
+            best_move = index
+    if best_move is None:
+        return None
+    return state.cell(best_move)
+
+
+def random_move(state, rng=random):
+    """
+        Returns a random move.
+        :param state: the GameState
+        :param rng: the random generator (a random.Random, or the random module)
+        :return: a random (row, col) cell the mouse can move to
+    """
+    return rng.choice(state.legal_mouse_moves())
+
+
+def easy_mouse_move(state, rng=random):
+    """
+        Easy AI that makes random moves.
+        :param state: the GameState
+        :param rng: the random generator
+        :return: the (row, col) cell the mouse should move to
+    """
+    return random_move(state, rng)
+
+
+def medium_mouse_move(state, rng=random):
+    """
+        Medium AI that makes random moves 40% of the time and best moves 60% of the time.
+        :param state: the GameState
+        :param rng: the random generator
+        :return: the (row, col) cell the mouse should move to
+    """
+    chance = rng.randint(1, 10)
+    if chance <= 4:
+        return random_move(state, rng)
+    return choose_best_move(state)
+
+
+def hard_mouse_move(state, rng=random):
+    """
+        Hard AI that makes the best moves.
+        :param state: the GameState
+        :param rng: unused, the hard AI is deterministic
+        :return: the (row, col) cell the mouse should move to
+    """
+    return choose_best_move(state)
+
+
+def escape_mouse_move(state, rng=random):
+    """
+        AI that weighs the escape routes: among the moves at most one step longer than the shortest escape, it
+        plays the one that evaluate_escape scores best, so it heads for places with several disjoint ways out
+        instead of the last of the nearest cells. The escape paths of each move are repaired from those of the
+        position rather than searched again. The tablebase still plays forced escapes.
+        :param state: the GameState
+        :param rng: unused, the escape AI is deterministic
+        :return: the (row, col) cell the mouse should move to, None if the mouse cannot move
+    """
+    solved = probe(state)
+    if solved is not None:
+        return solved[1]
+    distances = distances_for(state)
+    obstacles = state.obstacles
+    moves = [index for index in state.topology.neighbor_cells[state.mouse] if not obstacles >> index & 1]
+    if not moves:
+        return None
+    nearest = min(distances[index] for index in moves)
+    flow = escape_flow(state)
+    best_move = None
+    best_score = None
+    for index in moves:
+        if distances[index] > nearest + 1:
+            continue
+        child = state.copy()
+        child.mouse = index
+        score = evaluate_escape(child, flow.copy(MAX_COUNTED).update(child))
+        if score is not None and (best_score is None or score > best_score):
+            best_score = score
+            best_move = index
+    if best_move is None:
+        return choose_best_move(state)
+    return state.cell(best_move)
+
+
+MOUSE_POLICIES = {
+    "easy": easy_mouse_move,
+    "medium": medium_mouse_move,
+    "hard": hard_mouse_move,
+    "escape": escape_mouse_move
+}
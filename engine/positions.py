@@ -0,0 +1,60 @@
+"""
+    This module contains the generation of random starting positions, optionally constrained so that the mouse
+    is neither trapped nor about to escape.
+"""
+import random
+
+from engine.bitboard import random_mask
+from engine.game_state import GameState
+
+INF = float('inf')
+MAX_ATTEMPTS = 1000
+
+
+def escape_distance(state):
+    """
+        Counts the moves the mouse needs to reach the edge if the trapper does nothing. The search grows the
+        reachable area one ring at a time with bitboard shifts, so it stops as soon as the edge is reached.
+        :param state: the GameState
+        :return: the number of moves, 0 on the edge and inf if the mouse cannot escape
+    """
+    topology = state.topology
+    free = topology.full_mask & ~state.obstacles
+    reached = 1 << state.mouse
+    distance = 0
+    while not reached & topology.border_mask:
+        grown = topology.dilate(reached) & free
+        if grown == reached:
+            return INF
+        reached = grown
+        distance += 1
+    return distance
+
+
+def random_position(rows, cols, obstacles, rng=random, start=None, min_distance=0, escape=False):
+    """
+        Creates a starting position with a given number of random obstacles. The obstacles are drawn again
+        until the constraints hold.
+        :param rows: number of rows
+        :param cols: number of columns
+        :param obstacles: number of random obstacles
+        :param rng: the random generator (a random.Random, or the random module)
+        :param start: the (row, col) cell of the mouse, None for the center
+        :param min_distance: the mouse needs at least this many moves to reach the edge
+        :param escape: if True, the mouse must have a path to the edge
+        :return: the GameState, raises ValueError if no position meets the constraints after MAX_ATTEMPTS draws
+    """
+    state = GameState(rows, cols, start)
+    size = rows * cols
+    if not 0 <= obstacles < size:
+        raise ValueError(f"cannot place {obstacles} obstacles on {size} cells")
+    constrained = min_distance > 0 or escape
+    for _ in range(MAX_ATTEMPTS):
+        state.obstacles = random_mask(size, obstacles, state.mouse, rng)
+        if not constrained:
+            return state
+        distance = escape_distance(state)
+        if distance >= min_distance and (distance != INF or not escape):
+            return state
+    raise ValueError(f"no position with {obstacles} obstacles meets the constraints "
+                     f"after {MAX_ATTEMPTS} attempts")
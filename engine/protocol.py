@@ -0,0 +1,66 @@
+"""
+    This module contains the line protocol of the network mode. Every message is one line of ASCII words.
+
+    Client to server:
+        HOST [rows cols]    creates a match and plays the trapper
+        JOIN id             joins a match on the free side (the mouse, unless the trapper left);
+                            both sides are sent the position
+        MOVE row col        plays a move for the side of the client
+        RESET               restarts the match with new obstacles once the game is over; during a game
+                            both sides must send it, the request lapses with the next move
+    Server to client:
+        MATCH id role       the match was created or joined, role is Trapper or Mouse
+        STATE rows cols mouse turn obstacles
+                            the position: cell index of the mouse, T or M for the side to move,
+                            obstacle bitboard in hexadecimal
+        WIN winner          the game is over, winner is Trapper or Mouse
+        RESET role          the side role asked to restart the game, the other side must agree
+        LEFT                the opponent disconnected
+        ERROR message       the last command was refused
+"""
+from engine.game_state import GameState
+
+TRAPPER_TO_MOVE, MOUSE_TO_MOVE = "T", "M"
+
+
+def encode(*words):
+    """
+        Builds a message; characters outside ASCII (e.g. client input echoed in an error) become "?".
+        :param words: the command and its arguments
+        :return: the line as bytes, newline included
+    """
+    return (" ".join(str(word) for word in words) + "\n").encode("ascii", "replace")
+
+
+def decode(line):
+    """
+        Splits a received line into words.
+        :param line: the line as bytes
+        :return: the list of words, empty for a blank line
+    """
+    return line.decode("ascii", "replace").split()
+
+
+def state_message(state):
+    """
+        Builds the STATE message of a position.
+        :param state: the GameState
+        :return: the line as bytes
+    """
+    turn = TRAPPER_TO_MOVE if state.trapper_turn else MOUSE_TO_MOVE
+    return encode("STATE", state.rows, state.cols, state.mouse, turn, format(state.obstacles, "x"))
+
+
+def parse_state(words):
+    """
+        Rebuilds the position of a STATE message (without history).
+        :param words: the words of the message, "STATE" included
+        :return: the GameState, raises ValueError if the message is malformed
+    """
+    if len(words) != 6 or words[0] != "STATE" or words[4] not in (TRAPPER_TO_MOVE, MOUSE_TO_MOVE):
+        raise ValueError(f"malformed STATE message {' '.join(words)!r}")
+    rows, cols, mouse = int(words[1]), int(words[2]), int(words[3])
+    state = GameState(rows, cols, divmod(mouse, cols))
+    state.obstacles = int(words[5], 16)
+    state.trapper_turn = words[4] == TRAPPER_TO_MOVE
+    return state
@@ -0,0 +1,233 @@
+"""
+    This module contains the GameRecord class and the compact binary format of game records.
+
+    A record is a 27-byte header followed by the starting obstacles and one cell index per ply:
+        magic b"T2", seed (uint64), rows (uint16), cols (uint16), mouse start (uint32),
+        obstacle count (uint32), ply count (uint32), result (uint8: 0 unfinished, 1 mouse, 2 trapper)
+    Cell indexes (row * cols + col) take one byte when the board has at most 256 cells, two bytes when it has at
+    most 65536 and four bytes otherwise (little-endian). Records are concatenated in a file without any separator.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from engine.game_state import GameState, MOUSE, TRAPPER
+
+MAGIC = b"T2"
+HEADER = struct.Struct("<2sQHHIIIB")
+MAX_SIDE = 0xFFFF
+MAX_SEED = 0xFFFFFFFFFFFFFFFF
+TYPECODES = {2: "H", 4: "I"}
+RESULTS = {None: 0, MOUSE: 1, TRAPPER: 2}
+WINNERS = {code: winner for winner, code in RESULTS.items()}
+
+
+def cell_width(rows, cols):
+    """
+        Returns the number of bytes of a cell index on a board.
+        :param rows: number of rows
+        :param cols: number of columns
+        :return: 1, 2 or 4
+    """
+    size = rows * cols
+    if size <= 0x100:
+        return 1
+    return 2 if size <= 0x10000 else 4
+
+
+def check_encodable(rows, cols, seeds=range(1)):
+    """
+        Checks that games of a board size and seeds fit in the format.
+        :param rows: number of rows
+        :param cols: number of columns
+        :param seeds: the range of the seeds of the games
+        :return: raises ValueError if they do not fit
+    """
+    if not (1 <= rows <= MAX_SIDE and 1 <= cols <= MAX_SIDE):
+        raise ValueError(f"records hold boards of 1 to {MAX_SIDE} rows and columns, not {rows}x{cols}")
+    if seeds and not (0 <= min(seeds) and max(seeds) <= MAX_SEED):
+        raise ValueError(f"records hold seeds from 0 to {MAX_SEED}, not {min(seeds)} to {max(seeds)}")
+
+
+def pack_cells(cells, width):
+    """
+        Packs cell indexes.
+        :param cells: a list of cell indexes
+        :param width: bytes per index
+        :return: the bytes
+    """
+    if width == 1:
+        return bytes(cells)
+    packed = array(TYPECODES[width], cells)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_cells(data, width):
+    """
+        Unpacks cell indexes.
+        :param data: the bytes
+        :param width: bytes per index
+        :return: a list of cell indexes
+    """
+    if width == 1:
+        return list(data)
+    unpacked = array(TYPECODES[width])
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+class GameRecord:
+    """
+        This class represents a recorded game: the seed and starting position, then the cell of every move.
+    """
+
+    def __init__(self, seed, rows, cols, mouse_start, obstacles, moves, winner=None):
+        """
+            Initializes the GameRecord class.
+            :param seed: the seed the game was played with
+            :param rows: number of rows
+            :param cols: number of columns
+            :param mouse_start: cell index of the mouse at the start
+            :param obstacles: cell indexes of the starting obstacles
+            :param moves: cell index of every move, trapper first
+            :param winner: "Mouse", "Trapper" or None
+        """
+        self.seed = seed
+        self.rows = rows
+        self.cols = cols
+        self.mouse_start = mouse_start
+        self.obstacles = obstacles
+        self.moves = moves
+        self.winner = winner
+
+    @classmethod
+    def from_state(cls, state, seed):
+        """
+            Records a game from its final state; the starting position is rebuilt from the history.
+            :param state: the GameState after the game (with its history)
+            :param seed: the seed the game was played with
+            :return: the GameRecord
+        """
+        moves = state.moves()
+        obstacles = state.obstacles
+        for player, index in state.history:
+            if player == TRAPPER:
+                obstacles &= ~(1 << index)
+        mouse_start = next((index for player, index in state.history if player == MOUSE), state.mouse)
+        starting = [index for index in range(state.rows * state.cols) if obstacles >> index & 1]
+        return cls(seed, state.rows, state.cols, mouse_start, starting, moves, state.winner())
+
+    def start(self):
+        """
+            Builds the starting position.
+            :return: a new GameState
+        """
+        state = GameState(self.rows, self.cols)
+        state.mouse = self.mouse_start
+        for index in self.obstacles:
+            state.obstacles |= 1 << index
+        return state
+
+    def replay(self, ply=None):
+        """
+            Rebuilds the position after a number of moves, without rendering anything.
+            :param ply: number of moves to apply (None for the whole game)
+            :return: the GameState
+        """
+        state = self.start()
+        for index in self.moves[:ply]:
+            state.apply_move(*divmod(index, self.cols))
+        return state
+
+    def positions(self):
+        """
+            Steps through the game.
+            :return: yields the same GameState after the start and after every move
+        """
+        state = self.start()
+        yield state
+        for index in self.moves:
+            state.apply_move(*divmod(index, self.cols))
+            yield state
+
+    def encode(self):
+        """
+            Encodes the record in the binary format.
+            :return: the bytes of the record, raises ValueError if the board size or the seed does not fit
+        """
+        check_encodable(self.rows, self.cols, range(self.seed, self.seed + 1))
+        width = cell_width(self.rows, self.cols)
+        header = HEADER.pack(MAGIC, self.seed, self.rows, self.cols, self.mouse_start,
+                             len(self.obstacles), len(self.moves), RESULTS[self.winner])
+        return header + pack_cells(self.obstacles, width) + pack_cells(self.moves, width)
+
+    @classmethod
+    def decode(cls, buffer, offset=0):
+        """
+            Decodes one record.
+            :param buffer: bytes, memoryview or mmap holding records
+            :param offset: where the record starts
+            :return: (record, offset of the next record), raises ValueError on a corrupt record
+        """
+        magic, seed, rows, cols, mouse_start, obstacle_count, ply_count, result = HEADER.unpack_from(buffer, offset)
+        if magic != MAGIC:
+            raise ValueError(f"not a game record at offset {offset}")
+        width = cell_width(rows, cols)
+        start = offset + HEADER.size
+        middle = start + obstacle_count * width
+        end = middle + ply_count * width
+        obstacles = unpack_cells(buffer[start:middle], width)
+        moves = unpack_cells(buffer[middle:end], width)
+        return cls(seed, rows, cols, mouse_start, obstacles, moves, WINNERS[result]), end
+
+
+def write_records(file, records):
+    """
+        Appends records to an open binary file.
+        :param file: the file opened in binary mode
+        :param records: an iterable of GameRecord
+        :return: writes the records
+    """
+    for record in records:
+        file.write(record.encode())
+
+
+def scan_headers(path):
+    """
+        Reads only the headers of a record file, skipping the moves, through a memory map.
+        :param path: path of the record file
+        :return: yields (offset, seed, rows, cols, ply count, winner) for every record
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        offset = 0
+        size = len(data)
+        unpack_from = HEADER.unpack_from
+        while offset < size:
+            magic, seed, rows, cols, _, obstacle_count, ply_count, result = unpack_from(data, offset)
+            if magic != MAGIC:
+                raise ValueError(f"not a game record at offset {offset}")
+            yield offset, seed, rows, cols, ply_count, WINNERS[result]
+            offset += HEADER.size + (obstacle_count + ply_count) * cell_width(rows, cols)
+
+
+def read_records(path):
+    """
+        Reads every record of a file through a memory map.
+        :param path: path of the record file
+        :return: yields every GameRecord
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        offset = 0
+        while offset < len(data):
+            record, offset = GameRecord.decode(data, offset)
+            yield record
@@ -0,0 +1,116 @@
+"""
+    This module contains the builder of the tablebase (see engine/tablebase.py): a retrograde analysis of the
+    forced escapes of the mouse, vectorized over every obstacle set of the window with NumPy.
+"""
+import numpy as np
+
+from engine.bitboard import moves_for_row
+from engine.tablebase import HEADER, MAGIC, context_count, context_index, window_offsets
+
+
+def window_graph(radius, parity):
+    """
+        Returns the adjacency of the window cells and their distance to the center.
+        :param radius: the radius of the window
+        :param parity: row % 2 of the center
+        :return: (list of the neighbors of every window cell, list of distances)
+    """
+    offsets = window_offsets(radius, parity)
+    position = {offset: cell for cell, offset in enumerate(offsets)}
+    neighbors = [[position[(row + i, col + j)] for i, j in moves_for_row(parity + row)
+                  if (row + i, col + j) in position] for row, col in offsets]
+    frontier = [len(offsets) - 1]
+    distances = [None] * len(offsets)
+    distances[-1] = 0
+    while frontier:
+        ring = []
+        for cell in frontier:
+            for neighbor in neighbors[cell]:
+                if distances[neighbor] is None:
+                    distances[neighbor] = distances[cell] + 1
+                    ring.append(neighbor)
+        frontier = ring
+    return neighbors, distances
+
+
+def solve_context(radius, parity, exits):
+    """
+        Solves the positions of one context: for every obstacle set of the window, the fewest mouse moves that
+        force an escape from the center and the first of them.
+        M[j][m]: the mouse to move on m escapes within j moves; T[j][m]: the same with the trapper to move.
+        M[j][m] = some free neighbor n is an exit or T[j - 1][n]
+        T[j][m] = M[j][m] with every free cell other than m blocked, one at a time
+        :param radius: the radius of the window
+        :param parity: row % 2 of the center
+        :param exits: the window cells that are on the edge of the board
+        :return: a uint8 array of 2 ** (cells - 1) entries (moves << 3 | slot, 0 when there is no forced escape)
+    """
+    neighbors, distances = window_graph(radius, parity)
+    size = len(neighbors)
+    center = size - 1
+    keys = np.arange(1 << size, dtype=np.uint32)
+    blocked = [(keys >> cell & 1).astype(bool) for cell in range(size)]
+    with_obstacle = [keys | np.uint32(1 << cell) for cell in range(size)]
+    trapper_wins = {}
+    result = np.zeros(1 << size - 1, dtype=np.uint8)
+    solved = np.zeros(1 << size - 1, dtype=bool)
+    slots = {cell: moves_for_row(parity).index(window_offsets(radius, parity)[cell]) for cell in neighbors[center]}
+    for moves in range(1, radius + 1):
+        mouse_wins = {}
+        for cell in range(size):
+            if distances[cell] > radius - moves:
+                continue
+            wins = np.zeros(1 << size, dtype=bool)
+            for neighbor in neighbors[cell]:
+                if neighbor in exits:
+                    escape = ~blocked[neighbor]
+                elif moves > 1:
+                    escape = ~blocked[neighbor] & ~trapper_wins[neighbor]
+                else:
+                    continue
+                if cell == center:
+                    first = escape[:1 << size - 1] & ~solved
+                    result[first] = moves << 3 | slots[neighbor]
+                    solved |= first
+                wins |= escape
+            mouse_wins[cell] = wins
+        if moves == radius:
+            break
+        trapper_wins = {}
+        for cell in range(size):
+            if distances[cell] > radius - moves:
+                continue
+            holds = np.ones(1 << size, dtype=bool)
+            free = np.zeros(1 << size, dtype=bool)
+            for obstacle in range(size):
+                if obstacle != cell:
+                    holds &= blocked[obstacle] | mouse_wins[cell][with_obstacle[obstacle]]
+                    free |= ~blocked[obstacle]
+            # trapper_wins holds where the trapper stops the escape within these moves
+            trapper_wins[cell] = ~(holds & (free | mouse_wins[cell]))
+    return result
+
+
+def build(path, radius):
+    """
+        Builds a tablebase file.
+        :param path: the file to write
+        :param radius: the radius of the window (moves of the forced escapes)
+        :return: writes the file
+    """
+    clip = radius + 1
+    contexts = [None] * context_count(radius)
+    for parity in (0, 1):
+        offsets = window_offsets(radius, parity)
+        for top in range(1, clip + 1):
+            for bottom in range(1, clip + 1):
+                for left in range(1, clip + 1):
+                    for right in range(1, clip + 1):
+                        exits = {cell for cell, (i, j) in enumerate(offsets)
+                                 if i == -top or i == bottom or j == -left or j == right}
+                        context = context_index(radius, parity, top, bottom, left, right)
+                        contexts[context] = solve_context(radius, parity, exits)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, radius, len(window_offsets(radius, 0))))
+        for table in contexts:
+            file.write(table.tobytes())
@@ -0,0 +1,294 @@
+"""
+    This module contains the AlphaBetaSearch class: iterative-deepening alpha-beta for the trapper and the mouse.
+"""
+import time
+
+from engine.distances import DistanceField, INF
+from engine.game_state import MOUSE
+from engine.zobrist import zobrist_keys
+
+WIN_SCORE = 1000000
+TRAPPED_SCORE = 100000
+EXACT, LOWER, UPPER = 0, 1, 2
+TIME_CHECK_INTERVAL = 16
+
+
+class SearchTimeout(Exception):
+    """
+        Raised inside the search when the time budget is spent or the search is cancelled.
+    """
+
+
+class AlphaBetaSearch:
+    """
+        This class searches the best move for the side to move with iterative-deepening negamax and alpha-beta.
+        Leaves are scored with the BFS distance of the mouse to the edge, positions are hashed with Zobrist keys
+        and stored in a fixed-size transposition table. An instance can be called like a policy.
+    """
+
+    def __init__(self, time_budget=0.1, max_depth=32, table_bits=16, trapper_width=10):
+        """
+            Initializes the AlphaBetaSearch class.
+            :param time_budget: seconds allowed per move
+            :param max_depth: maximum depth in plies
+            :param table_bits: the transposition table has 2 ** table_bits entries
+            :param trapper_width: maximum number of trapper moves tried per node
+        """
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table = [None] * (1 << table_bits)
+        self.table_mask = (1 << table_bits) - 1
+        self.trapper_width = trapper_width
+        self.nodes = 0
+        self.depth_reached = 0
+        self.deadline = 0
+        self.keys = None
+        self.field = None
+        self.mouse_stack = []
+        self.cancel = None
+
+    def __call__(self, state, cancel=None):
+        """
+            Chooses a move, so the search can be used as a policy.
+            :param state: the GameState
+            :param cancel: optional threading.Event that stops the search like the end of the time budget
+            :return: the (row, col) cell to play
+        """
+        return self.best_move(state, cancel)
+
+    def best_move(self, state, cancel=None):
+        """
+            Searches deeper and deeper until the time budget is spent, the search is cancelled or the game is solved.
+            :param state: the GameState (not modified)
+            :param cancel: optional threading.Event that stops the search like the end of the time budget
+            :return: the (row, col) cell to play for the side to move
+        """
+        self.cancel = cancel
+        root = state.copy()
+        root.history = []
+        self.keys = zobrist_keys(root.rows, root.cols)
+        self.field = DistanceField(root)
+        self.mouse_stack = []
+        self.nodes = 0
+        self.depth_reached = 0
+        self.deadline = time.perf_counter() + self.time_budget
+        root_hash = self.keys.hash(root.obstacles, root.mouse, root.trapper_turn)
+
+        moves = self.ordered_moves(root, None)
+        best = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self.search_root(root, root_hash, depth, moves)
+            except SearchTimeout:
+                self.unwind(root, state)
+                break
+            best = move
+            self.depth_reached = depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCORE - self.max_depth:
+                break
+        return root.cell(best)
+
+    def unwind(self, root, state):
+        """
+            Restores the root after the search was interrupted in the middle of a line.
+            :param root: the working copy of the state
+            :param state: the original state
+            :return: restores the root
+        """
+        root.obstacles = state.obstacles
+        root.mouse = state.mouse
+        root.trapper_turn = state.trapper_turn
+        self.mouse_stack = []
+
+    def search_root(self, state, hash_value, depth, moves):
+        """
+            Searches every root move to a depth.
+            :param state: the working GameState
+            :param hash_value: the Zobrist hash of the root
+            :param depth: the depth in plies
+            :param moves: the root moves, best first
+            :return: (score, move) of the best move
+        """
+        alpha, beta = -INF, INF
+        best_move = moves[0]
+        for index in moves:
+            child_hash = self.play(state, index, hash_value)
+            score = -self.negamax(state, child_hash, depth - 1, -beta, -alpha, 1)
+            self.unplay(state, index)
+            if score > alpha:
+                alpha = score
+                best_move = index
+        self.store(hash_value, depth, alpha, EXACT, best_move, 0)
+        return alpha, best_move
+
+    def negamax(self, state, hash_value, depth, alpha, beta, ply):
+        """
+            Scores a position for the side to move.
+            :param state: the working GameState
+            :param hash_value: the Zobrist hash of the position
+            :param depth: remaining depth in plies
+            :param alpha: lower bound
+            :param beta: upper bound
+            :param ply: distance from the root
+            :return: the score of the position for the side to move
+        """
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and (time.perf_counter() > self.deadline
+                                                      or self.cancel is not None and self.cancel.is_set()):
+            raise SearchTimeout()
+
+        winner = state.winner()
+        if winner is not None:
+            mouse_score = WIN_SCORE - ply if winner == MOUSE else ply - WIN_SCORE
+            return -mouse_score if state.trapper_turn else mouse_score
+        if depth == 0:
+            return self.evaluate(state)
+
+        alpha_original = alpha
+        tt_move = None
+        entry = self.table[hash_value & self.table_mask]
+        if entry is not None and entry[0] == hash_value:
+            _, entry_depth, entry_score, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                entry_score = self.score_from_table(entry_score, ply)
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                elif entry_flag == UPPER:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        best_score = -INF
+        best_move = None
+        for index in self.ordered_moves(state, tt_move):
+            child_hash = self.play(state, index, hash_value)
+            score = -self.negamax(state, child_hash, depth - 1, -beta, -alpha, ply + 1)
+            self.unplay(state, index)
+            if score > best_score:
+                best_score = score
+                best_move = index
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_original:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(hash_value, depth, best_score, flag, best_move, ply)
+        return best_score
+
+    def store(self, hash_value, depth, score, flag, move, ply):
+        """
+            Stores a result in the transposition table, replacing the entry of the slot.
+            :param hash_value: the Zobrist hash of the position
+            :param depth: the depth searched
+            :param score: the score found
+            :param flag: EXACT, LOWER or UPPER
+            :param move: the best move found
+            :param ply: distance from the root (win scores are stored relative to the position)
+            :return: stores the entry
+        """
+        if score >= WIN_SCORE - self.max_depth - ply:
+            score += ply
+        elif score <= self.max_depth + ply - WIN_SCORE:
+            score -= ply
+        self.table[hash_value & self.table_mask] = (hash_value, depth, score, flag, move)
+
+    def score_from_table(self, score, ply):
+        """
+            Converts a stored win score back to the distance from the root.
+            :param score: the stored score
+            :param ply: distance from the root
+            :return: the score seen from the root
+        """
+        if score >= WIN_SCORE - self.max_depth:
+            return score - ply
+        if score <= self.max_depth - WIN_SCORE:
+            return score + ply
+        return score
+
+    def play(self, state, index, hash_value):
+        """
+            Plays a move on the working state.
+            :param state: the working GameState
+            :param index: the cell index of the move
+            :param hash_value: the hash before the move
+            :return: the hash after the move
+        """
+        keys = self.keys
+        if state.trapper_turn:
+            state.obstacles |= 1 << index
+            hash_value ^= keys.obstacle[index]
+        else:
+            self.mouse_stack.append(state.mouse)
+            hash_value ^= keys.mouse[state.mouse] ^ keys.mouse[index]
+            state.mouse = index
+        state.trapper_turn = not state.trapper_turn
+        return hash_value ^ keys.mouse_turn
+
+    def unplay(self, state, index):
+        """
+            Takes back a move played with play.
+            :param state: the working GameState
+            :param index: the cell index of the move
+            :return: restores the state
+        """
+        state.trapper_turn = not state.trapper_turn
+        if state.trapper_turn:
+            state.obstacles &= ~(1 << index)
+        else:
+            state.mouse = self.mouse_stack.pop()
+
+    def evaluate(self, state):
+        """
+            Scores a quiet position with the BFS distance of the mouse to the edge.
+            :param state: the working GameState
+            :return: the score for the side to move
+        """
+        distances = self.field.update(state)
+        exits = [distances[index] for index in state.topology.neighbor_cells[state.mouse]
+                 if not state.obstacles >> index & 1]
+        nearest = min(exits)
+        if nearest == INF:
+            mouse_score = len(exits) - TRAPPED_SCORE
+        else:
+            mouse_score = 10 * exits.count(nearest) - 100 * nearest
+        return -mouse_score if state.trapper_turn else mouse_score
+
+    def ordered_moves(self, state, tt_move):
+        """
+            Generates the moves to search, most promising first.
+            The mouse tries its free neighbors by distance; the trapper tries the free neighbors of the mouse and
+            the cells on a shortest path from each of them to the edge, at most trapper_width of them.
+            :param state: the working GameState
+            :param tt_move: the best move stored for the position, tried first
+            :return: a list of cell indexes
+        """
+        distances = self.field.update(state)
+        topology = state.topology
+        obstacles = state.obstacles
+        exits = sorted((index for index in topology.neighbor_cells[state.mouse] if not obstacles >> index & 1),
+                       key=distances.__getitem__)
+        if state.trapper_turn:
+            moves = list(exits)
+            for index in exits:
+                while distances[index] not in (0, INF) and len(moves) < 2 * self.trapper_width:
+                    step = distances[index] - 1
+                    index = next(neighbor for neighbor in topology.neighbor_cells[index]
+                                 if distances[neighbor] == step)
+                    if index != state.mouse and not obstacles >> index & 1 and index not in moves:
+                        moves.append(index)
+            moves = moves[:self.trapper_width]
+        else:
+            moves = exits
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
@@ -0,0 +1,248 @@
+"""
+    This module contains the MatchServer class: an asyncio server hosting many two-player matches.
+    The server owns the GameState of every match and validates each move with the rules of the engine.
+"""
+import asyncio
+import random
+
+from engine.game_state import GameState, MOUSE, TRAPPER
+from engine.protocol import encode, decode, state_message
+
+DEFAULT_SIZE = 11
+MAX_SIZE = 101
+OBSTACLE_RANGE = (3, 7)
+MAX_LINE = 256
+
+
+class Match:
+    """
+        This class represents a match: its position, the connection of each side and the sides that asked to
+        restart the game. Idle matches only hold a small GameState and two references, so thousands fit in one
+        process.
+    """
+
+    __slots__ = ("id", "state", "players", "resets")
+
+    def __init__(self, match_id, state):
+        """
+            Initializes the Match class.
+            :param match_id: the number of the match
+            :param state: the starting GameState
+        """
+        self.id = match_id
+        self.state = state
+        self.players = {TRAPPER: None, MOUSE: None}
+        self.resets = set()
+
+    def send(self, message):
+        """
+            Sends a message to the connected players.
+            :param message: the line as bytes
+            :return: queues the message on the writers
+        """
+        for writer in self.players.values():
+            if writer is not None:
+                writer.write(message)
+
+
+class MatchServer:
+    """
+        This class serves the line protocol of engine/protocol.py. Each connection plays one side of one match;
+        the match is dropped when both sides have left.
+    """
+
+    def __init__(self, seed=None):
+        """
+            Initializes the MatchServer class.
+            :param seed: seed of the obstacles of the matches, None for a random one
+        """
+        self.rng = random.Random(seed)
+        self.matches = {}
+        self.next_id = 1
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+            Starts listening.
+            :param host: the address to listen on
+            :param port: the port, 0 for a free one
+            :return: the (host, port) the server listens on
+        """
+        self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """
+            Stops listening and waits for the server to close.
+            :return: closes the server
+        """
+        self.server.close()
+        await self.server.wait_closed()
+
+    def new_state(self, rows, cols):
+        """
+            Creates the starting position of a match.
+            :param rows: number of rows
+            :param cols: number of columns
+            :return: the GameState with random obstacles
+        """
+        state = GameState(rows, cols)
+        state.random_obstacles(*OBSTACLE_RANGE, self.rng)
+        return state
+
+    async def handle(self, reader, writer):
+        """
+            Serves one connection until it closes.
+            :param reader: the asyncio.StreamReader of the connection
+            :param writer: the asyncio.StreamWriter of the connection
+            :return: serves the client
+        """
+        seat = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(encode("ERROR", "line too long"))
+                    break
+                if not line:
+                    break
+                words = decode(line)
+                if not words:
+                    continue
+                try:
+                    seat = self.dispatch(words, writer, seat)
+                except ValueError as error:
+                    writer.write(encode("ERROR", error))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if seat is not None:
+                self.leave(*seat)
+            writer.close()
+
+    def dispatch(self, words, writer, seat):
+        """
+            Runs a command.
+            :param words: the words of the command
+            :param writer: the asyncio.StreamWriter of the client
+            :param seat: the (match, role) of the client, None if it has not hosted or joined yet
+            :return: the seat of the client after the command, raises ValueError if the command is refused
+        """
+        command, arguments = words[0].upper(), words[1:]
+        if command in ("HOST", "JOIN"):
+            if seat is not None:
+                raise ValueError("already in a match")
+            return self.host(writer, arguments) if command == "HOST" else self.join(writer, arguments)
+        if seat is None:
+            raise ValueError("host or join a match first")
+        if command == "MOVE":
+            self.move(*seat, arguments)
+        elif command == "RESET":
+            self.reset(*seat)
+        else:
+            raise ValueError(f"unknown command {command}")
+        return seat
+
+    def host(self, writer, arguments):
+        """
+            Creates a match and seats the client as the trapper.
+            :param writer: the asyncio.StreamWriter of the client
+            :param arguments: optional rows and cols
+            :return: the seat of the client
+        """
+        rows, cols = parse_integers(arguments, 2) if arguments else (DEFAULT_SIZE, DEFAULT_SIZE)
+        if not (3 <= rows <= MAX_SIZE and 3 <= cols <= MAX_SIZE):
+            raise ValueError(f"the board must have 3 to {MAX_SIZE} rows and columns")
+        match = Match(self.next_id, self.new_state(rows, cols))
+        self.next_id += 1
+        self.matches[match.id] = match
+        match.players[TRAPPER] = writer
+        writer.write(encode("MATCH", match.id, TRAPPER))
+        writer.write(state_message(match.state))
+        return match, TRAPPER
+
+    def join(self, writer, arguments):
+        """
+            Seats the client on the free side of a match; both sides get the position, so the opponent knows
+            the match can start.
+            :param writer: the asyncio.StreamWriter of the client
+            :param arguments: the match id
+            :return: the seat of the client
+        """
+        match = self.matches.get(parse_integers(arguments, 1)[0])
+        if match is None:
+            raise ValueError("no such match")
+        free = [role for role in (MOUSE, TRAPPER) if match.players[role] is None]
+        if not free:
+            raise ValueError("the match is full")
+        role = free[0]
+        match.players[role] = writer
+        writer.write(encode("MATCH", match.id, role))
+        match.send(state_message(match.state))
+        return match, role
+
+    def move(self, match, role, arguments):
+        """
+            Plays a move for a side after checking that it is legal.
+            :param match: the Match
+            :param role: the side of the client
+            :param arguments: row and col
+            :return: plays the move and sends the new position to both sides
+        """
+        row, col = parse_integers(arguments, 2)
+        state = match.state
+        if None in match.players.values():
+            raise ValueError("waiting for the opponent")
+        if (role == TRAPPER) != state.trapper_turn:
+            raise ValueError("not your turn")
+        state.apply_move(row, col)
+        match.resets.clear()
+        match.send(state_message(state))
+        winner = state.winner()
+        if winner is not None:
+            match.send(encode("WIN", winner))
+
+    def reset(self, match, role):
+        """
+            Restarts a match with new obstacles. A finished game restarts at once; during a game the request is
+            kept until the other side asks too, so neither side can wipe a position it is losing. A side whose
+            opponent left decides alone.
+            :param match: the Match
+            :param role: the side of the client
+            :return: restarts the match, or tells both sides that this side asked to
+        """
+        if match.state.winner() is None:
+            match.resets.add(role)
+            if len(match.resets) < sum(writer is not None for writer in match.players.values()):
+                match.send(encode("RESET", role))
+                return
+        match.resets.clear()
+        match.state = self.new_state(match.state.rows, match.state.cols)
+        match.send(state_message(match.state))
+
+    def leave(self, match, role):
+        """
+            Frees the seat of a client that disconnected and drops the match when nobody is left.
+            :param match: the Match
+            :param role: the side of the client
+            :return: tells the opponent
+        """
+        match.players[role] = None
+        match.resets.clear()
+        match.send(encode("LEFT"))
+        if all(writer is None for writer in match.players.values()):
+            del self.matches[match.id]
+
+
+def parse_integers(arguments, count):
+    """
+        Parses the integer arguments of a command.
+        :param arguments: the words after the command
+        :param count: the number of integers expected
+        :return: the list of integers, raises ValueError if there are not exactly count integers
+    """
+    if len(arguments) != count:
+        raise ValueError(f"expected {count} arguments, got {len(arguments)}")
+    return [int(argument) for argument in arguments]
@@ -0,0 +1,169 @@
+"""
+    This module contains the Tablebase class: exact forced escapes of the mouse, looked up in a table built offline
+    by engine/retrograde.py (python -m src.build_tablebase).
+
+    Whether the mouse can force its way to the edge within k moves only depends on the cells within k moves of it:
+    its paths never leave them and obstacles placed elsewhere change nothing. So positions are keyed by a context
+    (the parity of the mouse row and its distance to each edge, clipped at radius + 1) and by the obstacles of the
+    window of cells within radius moves of the mouse, and the table holds one byte per key:
+        0 if the mouse cannot force an escape within radius moves, else moves << 3 | slot,
+    where slot is the index of the first move in MOVES_ODD_ROW / MOVES_EVEN_ROW.
+
+    File: magic b"TB", radius (uint8), window size (uint8), then 2 * (radius + 1) ** 4 contexts of
+    2 ** (window size - 1) bytes each. Window cells are in the order of window_offsets, the mouse last;
+    bit i of a key is set when cell i is an obstacle or off the board.
+"""
+import mmap
+import os
+import struct
+from functools import lru_cache
+
+from engine.bitboard import moves_for_row
+
+MAGIC = b"TB"
+HEADER = struct.Struct("<2sBB")
+RADIUS = 2
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebase.bin")
+
+
+@lru_cache(maxsize=None)
+def window_offsets(radius, parity):
+    """
+        Returns the (row, col) offsets of the cells within radius moves of a cell, nearest first and the cell itself
+        last; with offset rows the shape depends on the parity of the row.
+        :param radius: the radius of the window
+        :param parity: row % 2 of the center
+        :return: a tuple of (row, col) offsets
+    """
+    seen = {(0, 0)}
+    frontier = [(0, 0)]
+    offsets = []
+    for _ in range(radius):
+        ring = []
+        for row, col in frontier:
+            for i, j in moves_for_row(parity + row):
+                if (row + i, col + j) not in seen:
+                    seen.add((row + i, col + j))
+                    ring.append((row + i, col + j))
+        offsets.extend(sorted(ring))
+        frontier = ring
+    return tuple(offsets) + ((0, 0),)
+
+
+def context_index(radius, parity, top, bottom, left, right):
+    """
+        Numbers a context; the distances to the edges are clipped at radius + 1 by the caller.
+        :param radius: the radius of the window
+        :param parity: row % 2 of the mouse
+        :param top: distance of the mouse to the top edge (1 to radius + 1)
+        :param bottom: distance to the bottom edge
+        :param left: distance to the left edge
+        :param right: distance to the right edge
+        :return: the index of the context
+    """
+    base = radius + 1
+    return (((parity * base + top - 1) * base + bottom - 1) * base + left - 1) * base + right - 1
+
+
+def context_count(radius):
+    """
+        Returns the number of contexts of a radius.
+        :param radius: the radius of the window
+        :return: the number of contexts
+    """
+    return 2 * (radius + 1) ** 4
+
+
+class Tablebase:
+    """
+        This class looks positions up in a tablebase file. The file is memory-mapped on the first lookup, so
+        creating a Tablebase costs nothing; without a file every lookup misses.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+            Initializes the Tablebase class.
+            :param path: the tablebase file
+        """
+        self.path = path
+        self.table = None
+        self.radius = None
+        self.entries = 0
+        self.loaded = False
+
+    def load(self):
+        """
+            Maps the file, once.
+            :return: True if the table is available, False otherwise
+        """
+        if not self.loaded:
+            self.loaded = True
+            try:
+                with open(self.path, "rb") as file:
+                    self.table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return False
+            magic, self.radius, size = HEADER.unpack_from(self.table)
+            self.entries = 1 << size - 1
+            if magic != MAGIC or len(self.table) != HEADER.size + context_count(self.radius) * self.entries:
+                raise ValueError(f"{self.path} is not a tablebase")
+        return self.table is not None
+
+    @lru_cache(maxsize=None)
+    def window(self, rows, cols, mouse):
+        """
+            Returns where the key of a mouse cell is read from.
+            :param rows: number of rows
+            :param cols: number of columns
+            :param mouse: the cell index of the mouse (not on the edge)
+            :return: (offset of the context in the file, first cell of the window, mask of the rows of the window
+                      once shifted, tuple of (bit, cell - first cell), mask of the bits of off-board cells)
+        """
+        radius = self.radius
+        row, col = divmod(mouse, cols)
+        clip = radius + 1
+        context = context_index(radius, row % 2, min(row, clip), min(rows - 1 - row, clip), min(col, clip),
+                                min(cols - 1 - col, clip))
+        first = max(row - radius, 0) * cols
+        span = (min(row + radius, rows - 1) + 1) * cols - first
+        cells = []
+        off_board = 0
+        for bit, (i, j) in enumerate(window_offsets(radius, row % 2)[:-1]):
+            if 0 <= row + i < rows and 0 <= col + j < cols:
+                cells.append((bit, (row + i) * cols + col + j - first))
+            else:
+                off_board |= 1 << bit
+        return HEADER.size + context * self.entries, first, (1 << span) - 1, tuple(cells), off_board
+
+    def lookup(self, state):
+        """
+            Looks up the mouse to move.
+            :param state: the GameState (mouse to move, not on the edge)
+            :return: (moves, (row, col) of the first move) if the mouse can force an escape within the radius,
+                     None if it cannot or the position is not in the table
+        """
+        if state.trapper_turn or not self.load() or state.topology.is_border(state.mouse):
+            return None
+        offset, first, span, cells, key = self.window(state.rows, state.cols, state.mouse)
+        obstacles = state.obstacles >> first & span
+        for bit, cell in cells:
+            if obstacles >> cell & 1:
+                key |= 1 << bit
+        entry = self.table[offset + key]
+        if not entry:
+            return None
+        row, col = state.cell(state.mouse)
+        i, j = moves_for_row(row)[entry & 7]
+        return entry >> 3, (row + i, col + j)
+
+
+_tablebase = Tablebase()
+
+
+def probe(state):
+    """
+        Looks a position up in the default tablebase.
+        :param state: the GameState (mouse to move, not on the edge)
+        :return: (moves, (row, col) of the first move), None if there is no forced escape in the table
+    """
+    return _tablebase.lookup(state)
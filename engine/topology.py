@@ -0,0 +1,100 @@
+"""
+    This module contains the Topology class: the neighbor and border tables of a board size, built once.
+"""
+from array import array
+from functools import lru_cache
+
+from engine.bitboard import moves_for_row
+
+MAX_NEIGHBORS = 6
+
+
+class Topology:
+    """
+        This class holds the adjacency of a board size. Cell (row, col) has index row * cols + col, which is also
+        its bit in the bitboards.
+        adjacency is a flat int array with MAX_NEIGHBORS slots per cell (-1 when the neighbor is off the board),
+        neighbor_cells holds the same neighbors as tuples for Python loops, in the order of
+        MOVES_ODD_ROW / MOVES_EVEN_ROW. There is no bitboard per cell, as each would be as wide as the board:
+        the tables stay linear in the number of cells and dilate builds neighbor bitboards when they are needed.
+    """
+
+    def __init__(self, rows, cols):
+        """
+            Initializes the Topology class.
+            :param rows: number of rows
+            :param cols: number of columns
+        """
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.full_mask = (1 << self.size) - 1
+        self.adjacency = array("i", [-1] * (self.size * MAX_NEIGHBORS))
+        neighbor_cells = []
+        border_cells = []
+        for row in range(rows):
+            for col in range(cols):
+                index = row * cols + col
+                if row == 0 or row == rows - 1 or col == 0 or col == cols - 1:
+                    border_cells.append(index)
+                cells = tuple((row + i) * cols + col + j for i, j in moves_for_row(row)
+                              if 0 <= row + i < rows and 0 <= col + j < cols)
+                for slot, cell in enumerate(cells):
+                    self.adjacency[index * MAX_NEIGHBORS + slot] = cell
+                neighbor_cells.append(cells)
+        self.neighbor_cells = tuple(neighbor_cells)
+        self.border_cells = tuple(border_cells)
+        self.border_mask = 0
+        for index in border_cells:
+            self.border_mask |= 1 << index
+        self.interior_mask = self.full_mask & ~self.border_mask
+        self.first_col_mask = 0
+        self.odd_rows_mask = 0
+        for row in range(rows):
+            self.first_col_mask |= 1 << row * cols
+            if row % 2 == 1:
+                self.odd_rows_mask |= ((1 << cols) - 1) << row * cols
+        self.last_col_mask = self.first_col_mask << cols - 1
+
+    def dilate(self, mask):
+        """
+            Adds the neighbors of every cell of a bitboard, with shifts instead of a loop over the cells.
+            :param mask: the bitboard
+            :return: the bitboard of the cells and their neighbors
+        """
+        cols = self.cols
+        left = mask & ~self.first_col_mask
+        right = mask & ~self.last_col_mask
+        odd = right & self.odd_rows_mask
+        even = left & ~self.odd_rows_mask
+        grown = (mask | right << 1 | left >> 1 | mask << cols | mask >> cols
+                 | odd << cols + 1 | odd >> cols - 1 | even << cols - 1 | even >> cols + 1)
+        return grown & self.full_mask
+
+    def in_bounds(self, row, col):
+        """
+            Checks if a cell is on the board.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: True if the cell is on the board, False otherwise
+        """
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def is_border(self, index):
+        """
+            Checks if a cell is on the edge of the board.
+            :param index: the cell index
+            :return: True if the cell is on the edge, False otherwise
+        """
+        return self.border_mask >> index & 1 == 1
+
+
+@lru_cache(maxsize=None)
+def get_topology(rows, cols):
+    """
+        Returns the topology of a board size, built once and shared by the rules and the AIs.
+        :param rows: number of rows
+        :param cols: number of columns
+        :return: the Topology of the board size
+    """
+    return Topology(rows, cols)
@@ -0,0 +1,94 @@
+"""
+    This module contains the NumPy BFS: frontier-at-a-time distances from the edges for one or many boards.
+"""
+import numpy as np
+
+
+def obstacles_array(state):
+    """
+        Converts the obstacle bitboard of a state to a boolean array.
+        :param state: the GameState
+        :return: a (rows, cols) bool array, True on obstacles
+    """
+    size = state.rows * state.cols
+    data = np.frombuffer(state.obstacles.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, bitorder="little")[:size].astype(bool).reshape(state.rows, state.cols)
+
+
+def neighbor_union(cells, padded=None, out=None):
+    """
+        Marks every cell that has at least one marked neighbor (odd rows are shifted to the right).
+        :param cells: a (batch, rows, cols) bool array
+        :param padded: optional (batch, rows + 2, cols + 2) bool buffer with a False border, reused between calls
+        :param out: optional (batch, rows, cols) bool buffer for the result
+        :return: a (batch, rows, cols) bool array
+    """
+    batch, rows, cols = cells.shape
+    if padded is None:
+        padded = np.zeros((batch, rows + 2, cols + 2), dtype=bool)
+    if out is None:
+        out = np.empty_like(cells)
+    padded[:, 1:-1, 1:-1] = cells
+    np.logical_or(padded[:, 1:-1, 2:], padded[:, 1:-1, :-2], out=out)
+    out |= padded[:, :-2, 1:-1]
+    out |= padded[:, 2:, 1:-1]
+    out[:, 0::2] |= padded[:, 0:-2:2, :-2]
+    out[:, 0::2] |= padded[:, 2::2, :-2]
+    out[:, 1::2] |= padded[:, 1:-2:2, 2:]
+    out[:, 1::2] |= padded[:, 3::2, 2:]
+    return out
+
+
+def batch_distances(obstacles, mice):
+    """
+        Calculates the distances from the edges for a batch of boards of the same size, with the same rules as
+        the BFS in engine.distances: every edge cell starts at 0, obstacles are never entered and cells next
+        to the mouse are never expanded.
+        :param obstacles: a (batch, rows, cols) bool array, True on obstacles
+        :param mice: a (batch, 2) int array with the (row, col) of the mouse on every board
+        :return: a (batch, rows, cols) float array of distances (inf if unreachable)
+    """
+    obstacles = np.asarray(obstacles, dtype=bool)
+    mice = np.asarray(mice, dtype=np.intp).reshape(-1, 2)
+    batch, rows, cols = obstacles.shape
+
+    mouse_cells = np.zeros_like(obstacles)
+    mouse_cells[np.arange(batch), mice[:, 0], mice[:, 1]] = True
+    blocked = neighbor_union(mouse_cells)
+
+    frontier = np.zeros_like(obstacles)
+    frontier[:, 0, :] = frontier[:, -1, :] = True
+    frontier[:, :, 0] = frontier[:, :, -1] = True
+    seen = frontier | obstacles
+    expandable = ~blocked
+    padded = np.zeros((batch, rows + 2, cols + 2), dtype=bool)
+    expanding = np.empty_like(obstacles)
+    distances = np.full(obstacles.shape, np.inf)
+    distance = 0
+    while frontier.any():
+        distances[frontier] = distance
+        np.logical_and(frontier, expandable, out=expanding)
+        neighbor_union(expanding, padded, frontier)
+        frontier &= ~seen
+        seen |= frontier
+        distance += 1
+    return distances
+
+
+def distances(state):
+    """
+        Calculates the distances from the edges of one state.
+        :param state: the GameState
+        :return: a (rows, cols) float array of distances (inf if unreachable)
+    """
+    return batch_distances(obstacles_array(state)[None], [state.mouse_position])[0]
+
+
+def states_distances(states):
+    """
+        Calculates the distances from the edges of many states of the same size at once.
+        :param states: a list of GameState
+        :return: a (batch, rows, cols) float array of distances (inf if unreachable)
+    """
+    obstacles = np.stack([obstacles_array(state) for state in states])
+    return batch_distances(obstacles, [state.mouse_position for state in states])
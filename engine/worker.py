@@ -0,0 +1,81 @@
+"""
+    This module contains the MoveWorker class, which computes AI moves on a background thread.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MoveWorker:
+    """
+        This class runs one policy at a time on a worker thread, so the caller can keep drawing frames and poll
+        for the move. A policy is called as policy(state, cancel) with a copy of the state and a threading.Event
+        that is set when the move is no longer wanted; long searches should check it and return early.
+        The copy is one state object the worker keeps and brings up to date with every request, so the distances
+        and escape paths attached to it are repaired from the previous move instead of recomputed.
+    """
+
+    def __init__(self):
+        """
+            Initializes the MoveWorker class.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        self.future = None
+        self.cancel_token = None
+        self.state = None
+
+    @property
+    def busy(self):
+        """
+            Whether a move has been requested and not collected yet.
+            :return: True if a request is pending, False otherwise
+        """
+        return self.future is not None
+
+    def submit(self, policy, state):
+        """
+            Starts computing a move, cancelling the previous request if there is one.
+            :param policy: function that takes (GameState, cancel event) and returns the (row, col) to play
+            :param state: the GameState (copied, so the caller may keep changing it)
+            :return: starts the computation
+        """
+        self.cancel()
+        if self.state is None or (self.state.rows, self.state.cols) != (state.rows, state.cols):
+            self.state = state.copy()
+        else:
+            self.state.copy_from(state)
+        self.cancel_token = threading.Event()
+        self.future = self.executor.submit(policy, self.state, self.cancel_token)
+
+    def poll(self):
+        """
+            Collects the move if it is ready, without blocking.
+            :return: the (row, col) cell, or None if there is no request or it is not finished;
+                     an exception raised by the policy is raised here
+        """
+        if self.future is None or not self.future.done():
+            return None
+        future, self.future = self.future, None
+        return future.result()
+
+    def cancel(self):
+        """
+            Drops the pending request. The token is set and the thread is waited for, so the policy never runs
+            at the same time as the caller changes what it shares with it (e.g. a random generator).
+            :return: cancels the request
+        """
+        if self.future is None:
+            return
+        self.cancel_token.set()
+        future, self.future = self.future, None
+        try:
+            future.result()
+        except Exception:  # the move is dropped, so is its error
+            pass
+
+    def close(self):
+        """
+            Cancels the pending request and stops the thread.
+            :return: stops the worker
+        """
+        self.cancel()
+        self.executor.shutdown()
@@ -0,0 +1,64 @@
+"""
+    This module contains the Zobrist keys used to hash positions.
+"""
+import random
+from functools import lru_cache
+
+from engine.bitboard import iter_bits
+
+ZOBRIST_SEED = 0x5EED
+
+
+class ZobristKeys:
+    """
+        This class holds one random 64-bit key per obstacle cell, per mouse cell and for the side to move.
+        The hash of a position is the xor of the keys of its features, so a move updates it with one or two xors.
+    """
+
+    def __init__(self, rows, cols, seed=ZOBRIST_SEED):
+        """
+            Initializes the ZobristKeys class.
+            :param rows: number of rows
+            :param cols: number of columns
+            :param seed: seed of the key generator
+        """
+        rng = random.Random(seed)
+        size = rows * cols
+        self.obstacle = [rng.getrandbits(64) for _ in range(size)]
+        self.mouse = [rng.getrandbits(64) for _ in range(size)]
+        self.mouse_turn = rng.getrandbits(64)
+
+    def hash(self, obstacles, mouse, trapper_turn):
+        """
+            Hashes a position from scratch.
+            :param obstacles: the obstacle bitboard
+            :param mouse: the cell index of the mouse
+            :param trapper_turn: True if the trapper is to move
+            :return: the 64-bit hash
+        """
+        value = self.mouse[mouse]
+        if not trapper_turn:
+            value ^= self.mouse_turn
+        for index in iter_bits(obstacles):
+            value ^= self.obstacle[index]
+        return value
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(rows, cols):
+    """
+        Returns the Zobrist keys of a board size, built once and shared.
+        :param rows: number of rows
+        :param cols: number of columns
+        :return: the ZobristKeys of the board size
+    """
+    return ZobristKeys(rows, cols)
+
+
+def zobrist_hash(state):
+    """
+        Hashes a GameState.
+        :param state: the GameState
+        :return: the 64-bit hash of the obstacles, the mouse cell and the side to move
+    """
+    return zobrist_keys(state.rows, state.cols).hash(state.obstacles, state.mouse, state.trapper_turn)
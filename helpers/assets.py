@@ -0,0 +1,56 @@
+"""
+    This module contains the image cache: images are found relative to the package, loaded on first use and kept
+    only as a master of at most MASTER_SIZE pixels and the scaled variants that are drawn.
+"""
+import os
+from functools import lru_cache
+
+import pygame
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public")
+MOUSE_IMAGE = "mouse1.png"
+MENU_IMAGE = "menu_photo.png"
+SCALED_CACHE_SIZE = 32
+MASTER_SIZE = 1024
+
+
+def asset_path(name):
+    """
+        Returns the path of an image, whatever the working directory is.
+        :param name: the file name in public/
+        :return: the absolute path
+    """
+    return os.path.join(ASSET_DIR, name)
+
+
+@lru_cache(maxsize=None)
+def master_image(name):
+    """
+        Returns an image decoded once and shrunk so that no side is longer than MASTER_SIZE, which is more than
+        anything drawn; the full-size image is not kept, the sources can be much larger.
+        :param name: the file name in public/
+        :return: the pygame.Surface (shared, do not draw on it)
+    """
+    image = pygame.image.load(asset_path(name))
+    width, height = image.get_size()
+    scale = MASTER_SIZE / max(width, height)
+    if scale < 1:
+        image = pygame.transform.scale(image, (max(round(width * scale), 1), max(round(height * scale), 1)))
+    return image
+
+
+@lru_cache(maxsize=SCALED_CACHE_SIZE)
+def scaled_image(name, size, alpha=True):
+    """
+        Returns an image scaled to a size, scaled once per size from its master image, so a new size (e.g. at a
+        new zoom) does not decode the file again. Call it after the display mode is set, so the cached surface
+        has the pixel format of the display.
+        :param name: the file name in public/
+        :param size: the (width, height) in pixels
+        :param alpha: True to keep the transparency, False for an opaque image
+        :return: the pygame.Surface (shared, do not draw on it)
+    """
+    image = pygame.transform.scale(master_image(name), size)
+    if pygame.display.get_surface() is not None:
+        image = image.convert_alpha() if alpha else image.convert()
+    return image
@@ -3,6 +3,8 @@
 """
 import pygame
 
+from helpers.fonts import render_text
+
 
 def is_button_clicked(x, y, button):
     """
@@ -28,9 +30,6 @@ def draw_button(surface, button_rect, text, text_position, rect_color, text_colo
         :param text_color: the color of the text
         :return: draws a button
     """
-    pygame.font.init()
-    font_path = pygame.font.match_font("comicsansms")
-    font1 = pygame.font.Font(font_path, 24)
     pygame.draw.rect(surface, rect_color, button_rect)
-    button_text = font1.render(text, True, text_color)
+    button_text = render_text(text, 24, text_color)
     surface.blit(button_text, text_position)
@@ -0,0 +1,45 @@
+"""
+    This module contains the shared font registry and the cache of rendered text surfaces.
+"""
+from functools import lru_cache
+
+import pygame
+
+FONT_FACE = "comicsansms"
+TEXT_CACHE_SIZE = 128
+
+
+@lru_cache(maxsize=None)
+def font_path(face):
+    """
+        Looks up the file of a system font; pygame.font.match_font scans the system fonts, so it runs once per face.
+        :param face: the font name
+        :return: the path of the font file, None for the default font
+    """
+    return pygame.font.match_font(face)
+
+
+@lru_cache(maxsize=None)
+def get_font(size, face=FONT_FACE):
+    """
+        Returns the font of a face and size, created once.
+        :param size: the font size
+        :param face: the font name
+        :return: the pygame.font.Font
+    """
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(font_path(face), size)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text, size, color, face=FONT_FACE):
+    """
+        Renders a text, reusing the surface when the same text was rendered before.
+        :param text: the text
+        :param size: the font size
+        :param color: the color of the text (a tuple or a color name)
+        :param face: the font name
+        :return: the rendered pygame.Surface (shared, do not draw on it)
+    """
+    return get_font(size, face).render(text, True, color)
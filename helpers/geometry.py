@@ -0,0 +1,140 @@
+"""
+    This module contains the HexLayout class: the pixel geometry of the board, without pygame.
+"""
+import math
+
+SQRT3 = math.sqrt(3)
+BASE_RADIUS = 25
+MIN_RADIUS = 8
+CORNERS = [(math.sin(math.radians(60 * i)), math.cos(math.radians(60 * i))) for i in range(6)]
+
+
+class HexLayout:
+    """
+        This class maps cells to pixels and pixels to cells. Hexagons are pointy-top, rows are spaced by
+        2 * radius - 8 pixels, columns by sqrt(3) * radius + 1.7 pixels (the gaps scale with the radius,
+        these are the values at BASE_RADIUS) and odd rows are shifted right by half a row step.
+    """
+
+    def __init__(self, radius, origin_x, origin_y):
+        """
+            Initializes the HexLayout class.
+            :param radius: the radius of a hexagon
+            :param origin_x: x coordinate of the center of cell (0, 0)
+            :param origin_y: y coordinate of the center of cell (0, 0)
+        """
+        self.radius = radius
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        scale = radius / BASE_RADIUS
+        self.col_step = SQRT3 * radius + 1.7 * scale
+        self.row_step = 2 * radius - 8 * scale
+        self.odd_shift = self.row_step / 2
+        self.half_width = SQRT3 / 2 * radius
+
+    def center(self, row, col):
+        """
+            Returns the center of a cell.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: the (x, y) of the center
+        """
+        x = col * self.col_step + self.origin_x
+        if row % 2 == 1:
+            x += self.odd_shift
+        return x, row * self.row_step + self.origin_y
+
+    def vertices(self, row, col):
+        """
+            Returns the corners of the hexagon of a cell.
+            :param row: row of the cell
+            :param col: column of the cell
+            :return: a list of six (x, y) points
+        """
+        x, y = self.center(row, col)
+        radius = self.radius
+        return [(x + radius * sin, y + radius * cos) for sin, cos in CORNERS]
+
+    def size(self, rows, cols):
+        """
+            Returns the size of a board, from the leftmost to the rightmost corner and the top to the bottom one.
+            :param rows: number of rows
+            :param cols: number of columns
+            :return: the (width, height) in pixels
+        """
+        width = (cols - 1) * self.col_step + 2 * self.half_width
+        if rows > 1:
+            width += self.odd_shift
+        return width, (rows - 1) * self.row_step + 2 * self.radius
+
+    def contains(self, row, col, x, y):
+        """
+            Checks if a point is inside the hexagon of a cell (edges included).
+            :param row: row of the cell
+            :param col: column of the cell
+            :param x: x coordinate of the point
+            :param y: y coordinate of the point
+            :return: True if the point is inside, False otherwise
+        """
+        center_x, center_y = self.center(row, col)
+        dx = abs(x - center_x)
+        dy = abs(y - center_y)
+        return dx <= self.half_width and dy <= self.radius - dx / SQRT3
+
+    def pick(self, x, y, rows, cols):
+        """
+            Finds the cell under a point. Only the rows within a radius of y and, in each, the nearest column
+            can contain the point, so this costs the same on any board size.
+            :param x: x coordinate of the point
+            :param y: y coordinate of the point
+            :param rows: number of rows
+            :param cols: number of columns
+            :return: the (row, col) of the cell, (-1, -1) if the point is on no cell
+        """
+        first = max(math.ceil((y - self.origin_y - self.radius) / self.row_step), 0)
+        last = min(math.floor((y - self.origin_y + self.radius) / self.row_step), rows - 1)
+        for row in range(first, last + 1):
+            shift = self.odd_shift if row % 2 == 1 else 0
+            col = round((x - self.origin_x - shift) / self.col_step)
+            if 0 <= col < cols and self.contains(row, col, x, y):
+                return row, col
+        return -1, -1
+
+    def cells_in_rect(self, x, y, width, height, rows, cols, margin=0):
+        """
+            Finds the cells that paint inside a rectangle. The centers lie on a grid, so the grid is the spatial
+            index: the rows and, in each, the columns are found by division and nothing is scanned.
+            :param x: x coordinate of the left side of the rectangle
+            :param y: y coordinate of the top side of the rectangle
+            :param width: width of the rectangle
+            :param height: height of the rectangle
+            :param rows: number of rows
+            :param cols: number of columns
+            :param margin: pixels a cell paints beyond its hexagon
+            :return: yields (row, first column, last column) for every row with a cell in the rectangle
+        """
+        reach = self.radius + margin
+        first = max(math.ceil((y - self.origin_y - reach) / self.row_step), 0)
+        last = min(math.floor((y + height - self.origin_y + reach) / self.row_step), rows - 1)
+        for row in range(first, last + 1):
+            left = x - self.origin_x - (self.odd_shift if row % 2 == 1 else 0)
+            first_col = max(math.ceil((left - reach) / self.col_step), 0)
+            last_col = min(math.floor((left + width + reach) / self.col_step), cols - 1)
+            if first_col <= last_col:
+                yield row, first_col, last_col
+
+
+def fit_radius(rows, cols, width, height):
+    """
+        Finds the largest radius, up to BASE_RADIUS, at which a board fits in an area.
+        :param rows: number of rows
+        :param cols: number of columns
+        :param width: width of the area
+        :param height: height of the area
+        :return: the radius, MIN_RADIUS if the board does not fit even then
+    """
+    for radius in range(BASE_RADIUS, MIN_RADIUS, -1):
+        board_width, board_height = HexLayout(radius, 0, 0).size(rows, cols)
+        if board_width <= width and board_height <= height:
+            return radius
+    return MIN_RADIUS
@@ -0,0 +1,229 @@
+"""
+    This module contains the Profiler class: opt-in timings of the frame loop with percentiles, an on-screen
+    overlay and a periodic dump to a JSON Lines file.
+"""
+import json
+import os
+import time
+from collections import deque
+
+from helpers.fonts import get_font
+
+PROFILE_VARIABLE = "TRAP_PROFILE"
+PROFILE_FILE_VARIABLE = "TRAP_PROFILE_FILE"
+DEFAULT_FILE = "profile.jsonl"
+CAPACITY = 1024
+DUMP_INTERVAL = 10
+OVERLAY_INTERVAL = 0.5
+OVERLAY_POSITION = (10, 10)
+OVERLAY_FONT_SIZE = 14
+OVERLAY_COLOR = (0, 0, 0)
+PERCENTILES = (50, 95, 99)
+
+
+class Section:
+    """
+        This class times a block of code with a with statement and keeps the last CAPACITY durations in a ring
+        buffer. A section is reused for every timing of its name, so timing allocates nothing.
+    """
+
+    __slots__ = ("samples", "start")
+
+    def __init__(self, capacity=CAPACITY):
+        """
+            Initializes the Section class.
+            :param capacity: number of durations kept
+        """
+        self.samples = deque(maxlen=capacity)
+        self.start = 0
+
+    def __enter__(self):
+        """
+            Starts the timing.
+            :return: the section
+        """
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+            Stores the duration.
+            :param exc_info: the exception, if any
+            :return: stores the duration in milliseconds
+        """
+        self.samples.append(1000 * (time.perf_counter() - self.start))
+
+    def percentiles(self):
+        """
+            Returns the percentiles of the durations kept.
+            :return: a dict with the count, p50, p95, p99 and max in milliseconds, None if nothing was timed
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return None
+        stats = {"count": len(samples)}
+        for percentile in PERCENTILES:
+            stats[f"p{percentile}"] = round(samples[min(len(samples) - 1, len(samples) * percentile // 100)], 3)
+        stats["max"] = round(samples[-1], 3)
+        return stats
+
+
+class NullSection:
+    """
+        This class is the section handed out while the profiler is disabled: it does nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        """
+            Does nothing.
+            :return: the section
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+            Does nothing.
+            :param exc_info: the exception, if any
+        """
+
+
+NULL_SECTION = NullSection()
+
+
+class Profiler:
+    """
+        This class collects the timings of named sections while it is enabled. While it is disabled, section
+        returns a shared object whose with statement does nothing, so the hooks can stay in the code.
+    """
+
+    def __init__(self, enabled=False, path=None, dump_interval=DUMP_INTERVAL):
+        """
+            Initializes the Profiler class.
+            :param enabled: True to start collecting at once
+            :param path: JSON Lines file the percentiles are appended to, None for no dump
+            :param dump_interval: seconds between two dumps
+        """
+        self.enabled = enabled
+        self.path = path
+        self.dump_interval = dump_interval
+        self.sections = {}
+        self.counters = {}
+        self.next_dump = time.monotonic() + dump_interval
+        self.next_overlay = 0
+        self.overlay_rect = None
+
+    @classmethod
+    def from_environment(cls):
+        """
+            Creates the profiler configured by the environment: TRAP_PROFILE=1 enables it and TRAP_PROFILE_FILE
+            names the dump file (profile.jsonl by default).
+            :return: the Profiler
+        """
+        enabled = os.environ.get(PROFILE_VARIABLE, "") not in ("", "0")
+        return cls(enabled, os.environ.get(PROFILE_FILE_VARIABLE, DEFAULT_FILE))
+
+    def toggle(self):
+        """
+            Enables or disables the profiler; the timings collected so far are kept.
+            :return: True if the profiler is now enabled
+        """
+        self.enabled = not self.enabled
+        self.next_overlay = 0
+        return self.enabled
+
+    def section(self, name):
+        """
+            Returns the section of a name, to be used in a with statement.
+            :param name: the name of the section
+            :return: the Section, or a section that does nothing while the profiler is disabled
+        """
+        if not self.enabled:
+            return NULL_SECTION
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section()
+        return section
+
+    def timed(self, name, function):
+        """
+            Wraps a function so that its calls are timed, from any thread.
+            :param name: the name of the section
+            :param function: the function
+            :return: the wrapped function, or the function itself while the profiler is disabled
+        """
+        if not self.enabled:
+            return function
+        section = self.section(name)
+
+        def call(*args, **kwargs):
+            with section:
+                return function(*args, **kwargs)
+        return call
+
+    def add_counters(self, name, function):
+        """
+            Adds counters that are dumped and shown with the timings, e.g. the statistics of a cache.
+            :param name: the name of the counters
+            :param function: function that returns a dict of counters
+            :return: registers the counters
+        """
+        self.counters[name] = function
+
+    def stats(self):
+        """
+            Returns the percentiles of every section.
+            :return: a dict from section name to its percentiles
+        """
+        return {name: stats for name, section in list(self.sections.items())
+                if (stats := section.percentiles()) is not None}
+
+    def tick(self):
+        """
+            Appends the percentiles and the counters to the dump file when the dump interval has passed; called
+            once per frame.
+            :return: writes the dump
+        """
+        if not self.enabled or self.path is None:
+            return
+        now = time.monotonic()
+        if now < self.next_dump:
+            return
+        self.next_dump = now + self.dump_interval
+        record = {"time": round(time.time(), 3), "sections": self.stats(),
+                  "counters": {name: function() for name, function in self.counters.items()}}
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+    def draw_overlay(self, surface, erase):
+        """
+            Writes the percentiles in the top left corner, refreshed every OVERLAY_INTERVAL seconds.
+            :param surface: surface of the pygame window
+            :param erase: function called with (surface, rect) that redraws what the previous overlay covered
+            :return: the list of dirty rects
+        """
+        now = time.monotonic()
+        if now < self.next_overlay:
+            return []
+        self.next_overlay = now + OVERLAY_INTERVAL
+        rects = []
+        if self.overlay_rect is not None:
+            erase(surface, self.overlay_rect)
+            rects.append(self.overlay_rect)
+            self.overlay_rect = None
+        if not self.enabled:
+            return rects
+        font = get_font(OVERLAY_FONT_SIZE)
+        x, y = OVERLAY_POSITION
+        lines = [f"{name}: " + " ".join(f"{key} {value:.1f}" for key, value in stats.items() if key != "count")
+                 + " ms" for name, stats in sorted(self.stats().items())] or ["profiling..."]
+        lines += [f"{name}: " + " ".join(f"{key} {value:.2f}" if isinstance(value, float) else f"{key} {value}"
+                                         for key, value in function().items())
+                  for name, function in self.counters.items()]
+        for line in lines:
+            rect = surface.blit(font.render(line, True, OVERLAY_COLOR), (x, y))
+            self.overlay_rect = rect if self.overlay_rect is None else self.overlay_rect.union(rect)
+            y += rect.height
+        rects.append(self.overlay_rect)
+        return rects
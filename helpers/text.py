@@ -1,7 +1,7 @@
 """
     This module contains functions that write text on the pygame window.
 """
-import pygame
+from helpers.fonts import render_text
 
 WIDTH, HEIGHT = 900, 630
 LIGHT_GREEN = (43, 175, 98)
@@ -11,32 +11,24 @@ BLACK = (0, 0, 0)
 
 def win(player, surface):
     """
-        Announces the winner.
+        Announces the winner. The caller keeps the banner on screen for as long as it wants.
         :param player: the winner
         :param surface: surface of the pygame window
-        :return: writes who won
+        :return: the pygame.Rect of the banner
     """
-    pygame.display.flip()
-    pygame.font.init()
-    font_path = pygame.font.match_font("comicsansms")
-    font = pygame.font.Font(font_path, 36)
-    text = font.render(f"{player} won!", True, BLACK)
-    surface.blit(text, (50, 100))
-    pygame.display.flip()
+    text = render_text(f"{player} won!", 36, BLACK)
     print(f"{player} won!")
-    pygame.time.wait(2000)
+    return surface.blit(text, (50, 100))
 
 
-def write_turn(turn, surface, color):
+def write_turn(turn, surface, color, position=(WIDTH / 2 - 100, 570)):
     """
         Writes whose turn it is.
         :param turn: "Trapper" or "Mouse"
         :param surface: surface of the pygame window
         :param color: color of the text
+        :param position: the (x, y) of the text
         :return: writes whose turn it is at the bottom of the window
     """
-    pygame.font.init()
-    font_path = pygame.font.match_font("comicsansms")
-    font = pygame.font.Font(font_path, 36)
-    text = font.render(turn, True, color)
-    surface.blit(text, (WIDTH / 2 - 100, 570))
+    text = render_text(turn, 36, color)
+    surface.blit(text, position)
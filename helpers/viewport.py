@@ -0,0 +1,90 @@
+"""
+    This module contains the Viewport class: the zoom and pan of the board inside its area of the window,
+    without pygame.
+"""
+import math
+
+from helpers.geometry import HexLayout, SQRT3
+
+ZOOM_STEP = 1.25
+MAX_RADIUS = 50
+
+
+class Viewport:
+    """
+        This class is the camera of the board. The board is laid out at the zoom radius and scrolled by
+        (pan_x, pan_y) pixels, so the transform is a HexLayout whose origin moves: drawing and picking both go
+        through layout. Without zoom or pan, the board is drawn from the top left corner of the area.
+    """
+
+    def __init__(self, rows, cols, area, radius, min_radius=None, max_radius=MAX_RADIUS):
+        """
+            Initializes the Viewport class.
+            :param rows: number of rows
+            :param cols: number of columns
+            :param area: the (left, top, width, height) of the window the board is shown in
+            :param radius: the radius of the hexagons at the start
+            :param min_radius: the smallest radius of the zoom, the starting radius by default
+            :param max_radius: the largest radius of the zoom
+        """
+        self.rows = rows
+        self.cols = cols
+        self.left, self.top, self.width, self.height = area
+        self.radius = radius
+        self.min_radius = radius if min_radius is None else min_radius
+        self.max_radius = max(max_radius, radius)
+        self.pan_x = 0
+        self.pan_y = 0
+        self.layout = None
+        self.update_layout()
+
+    def update_layout(self):
+        """
+            Keeps the board in the area and lays it out for the current zoom and pan.
+            :return: sets layout
+        """
+        width, height = HexLayout(self.radius, 0, 0).size(self.rows, self.cols)
+        self.pan_x = min(max(self.pan_x, 0), max(math.ceil(width - self.width), 0))
+        self.pan_y = min(max(self.pan_y, 0), max(math.ceil(height - self.height), 0))
+        self.layout = HexLayout(self.radius, self.left + SQRT3 / 2 * self.radius - self.pan_x,
+                                self.top + self.radius - self.pan_y)
+
+    def pan(self, dx, dy):
+        """
+            Scrolls the board, as far as it goes.
+            :param dx: pixels the board moves to the right
+            :param dy: pixels the board moves down
+            :return: True if the view changed, False otherwise
+        """
+        before = self.pan_x, self.pan_y
+        self.pan_x -= round(dx)
+        self.pan_y -= round(dy)
+        self.update_layout()
+        return (self.pan_x, self.pan_y) != before
+
+    def zoom(self, steps, x, y):
+        """
+            Zooms in or out by ZOOM_STEP per step, keeping the point of the board under (x, y) in place; the gaps
+            between the hexagons scale with the radius, so every board coordinate scales by the same factor.
+            :param steps: the number of steps, positive to zoom in
+            :param x: x coordinate of the fixed point
+            :param y: y coordinate of the fixed point
+            :return: True if the view changed, False otherwise
+        """
+        radius = min(max(round(self.radius * ZOOM_STEP ** steps), self.min_radius), self.max_radius)
+        if radius == self.radius:
+            return False
+        scale = radius / self.radius
+        self.pan_x = round((x - self.left + self.pan_x) * scale - (x - self.left))
+        self.pan_y = round((y - self.top + self.pan_y) * scale - (y - self.top))
+        self.radius = radius
+        self.update_layout()
+        return True
+
+    def visible_rows(self, margin=0):
+        """
+            Finds the cells drawn in the area.
+            :param margin: pixels a cell paints beyond its hexagon
+            :return: yields (row, first column, last column) for every row with a visible cell
+        """
+        return self.layout.cells_in_rect(self.left, self.top, self.width, self.height, self.rows, self.cols, margin)
@@ -2,22 +2,28 @@
     This module contains the Game class.
 """
 import random
-from collections import deque
 
 import pygame
 
+from engine.escape import escape_flow
+from engine.game_state import TRAPPER
+from engine.mouse_ai import easy_mouse_move, medium_mouse_move, hard_mouse_move, best_move_cache
+from engine.search import AlphaBetaSearch
+from engine.worker import MoveWorker
 from objects.game_board import GameBoard
 from helpers.text import win
 from objects.menu import Menu
 from helpers.button import is_button_clicked
+from helpers.profiler import Profiler
 
 LIGHT_GREEN = (43, 175, 98)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
-WIDTH, HEIGHT = 900, 630
+BOARD_SIZE = 11
 MENU_WIDTH, MENU_HEIGHT = 700, 500
-MOVES_ODD_ROW = [(0, 1), (0, -1), (-1, 0), (-1, 1), (1, 0), (1, 1)]
-MOVES_EVEN_ROW = [(0, 1), (0, -1), (-1, 0), (-1, -1), (1, 0), (1, -1)]
+EXPERT_TIME_BUDGET = 0.25
+WIN_BANNER_MS = 2000
+FPS = 60
 
 
 class Game:
@@ -25,14 +31,20 @@ class Game:
         This class represents the game.
     """
 
-    def __init__(self):
+    def __init__(self, seed=None, rows=BOARD_SIZE, cols=BOARD_SIZE, start=None, density=None):
         """
             Initializes the Game class.
-        """
-        self.board = GameBoard(11, 11)
+            :param seed: seed of the obstacles and of the AI, None for a random one
+            :param rows: number of rows of the board
+            :param cols: number of columns of the board
+            :param start: the (row, col) cell of the mouse at the start, None for the center
+            :param density: the fraction of the cells that start as obstacles, None for 3 to 7 obstacles
+        """
+        self.rng = random.Random(seed)
+        self.board = GameBoard(rows, cols, self.rng, start, density)
         self.menu = Menu()
 
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.screen = pygame.display.set_mode(self.board.size)
         self.menu_screen = pygame.display.set_mode((MENU_WIDTH, MENU_HEIGHT))
         pygame.display.set_caption("Trap the Mouse")
 
@@ -44,51 +56,96 @@ class Game:
 
         self.ai_level = 0
         self.is_human_opponent = False
-        self.trapper_turn = True
 
-        self.mouse_position = (5, 5)
-        self.moves = MOVES_ODD_ROW
-        self.ai_levels ={
+        self.winner = None
+        self.banner_until = None
+        self.hints = False
+
+        self.worker = MoveWorker()
+        self.profiler = Profiler.from_environment()
+        self.profiler.add_counters("best move cache", best_move_cache.stats)
+        self.expert = AlphaBetaSearch(EXPERT_TIME_BUDGET)
+        self.ai_levels = {
             1: self.ai_easy_mouse_move,
             2: self.ai_medium_mouse_move,
-            3: self.ai_hard_mouse_move
+            3: self.ai_hard_mouse_move,
+            4: self.ai_expert_mouse_move
         }
 
+    @property
+    def state(self):
+        """
+            The engine state of the current board.
+            :return: the GameState of the board
+        """
+        return self.board.state
+
+    @property
+    def trapper_turn(self):
+        """
+            Whose turn it is, read from the game state.
+            :return: True if it is the trapper's turn, False otherwise
+        """
+        return self.state.trapper_turn
+
     def check_win(self):
         """
-            Checks if the trapper or the mouse won.
+            Checks if the trapper or the mouse won. The first time, the winner is announced and the banner
+            stays on screen for WIN_BANNER_MS while the frame loop keeps running.
             :return: True if someone won, False otherwise
         """
-        if self.mouse_position[0] == 0 or self.mouse_position[0] == self.board.rows - 1 or \
-                self.mouse_position[1] == 0 or self.mouse_position[1] == self.board.cols - 1:
-            win("Mouse", self.screen)
-            self.play = False
-            self.menu_active = True
-            self.back_menu()
-        else:
-            for move in self.moves:
-                row = self.mouse_position[0] + move[0]
-                col = self.mouse_position[1] + move[1]
-                if not self.board.matrix[row][col].is_obstacle:
-                    return False
-            win("Trapper", self.screen)
-            self.play = False
-            self.menu_active = True
-            self.back_menu()
-            self.ai_level = 0
+        winner = self.state.winner()
+        if winner is None:
+            return False
+        if self.banner_until is None:
+            self.winner = winner
+            pygame.display.update(win(winner, self.screen))
+            self.banner_until = pygame.time.get_ticks() + WIN_BANNER_MS
         return True
 
+    def close_banner(self):
+        """
+            Leaves a finished game once its banner has been shown.
+            :return: goes back to the menu
+        """
+        winner = self.winner
+        self.play = False
+        self.menu_active = True
+        self.back_menu()
+        if winner == TRAPPER:
+            self.ai_level = 0
+
     def reset(self):
         """
-            Resets the game.
+            Resets the game; a move the AI is still computing is dropped.
             :return: resets the game
         """
-        self.board = GameBoard(11, 11)
-        self.mouse_position = (5, 5)
+        self.worker.cancel()
+        self.winner = None
+        self.banner_until = None
+        self.board.reset(self.rng)
         self.start_game = True
         self.play = False
-        self.trapper_turn = True
 
+    def update_hint(self):
+        """
+            Marks the cells of a minimum cut between the mouse and the edge while it is the trapper's turn and the
+            hints are on: blocking all of them traps the mouse. The escape paths are repaired from the last move.
+            :return: sets the hint mask of the board
+        """
+        show = self.hints and self.trapper_turn and self.state.winner() is None
+        self.board.hint_mask = escape_flow(self.state).cut() if show else 0
+
+    def refresh_board(self):
+        """
+            Shows the changes of the board since the last frame.
+            :return: redraws the changed hexagons and updates only their part of the display
+        """
+        self.update_hint()
+        with self.profiler.section("draw"):
+            rects = self.board.update(self.screen)
+        if rects:
+            pygame.display.update(rects)
 
     def mouse_select(self, row, col):
         """
@@ -97,11 +154,7 @@ class Game:
         :param col: column of the mouse
         :return: selects the mouse and updates the mouse position
         """
-        self.board.matrix[self.mouse_position[0]][self.mouse_position[1]].is_mouse = False
-        self.board.matrix[row][col].set_mouse()
-        self.mouse_position = (row, col)
-        self.trapper_turn = True
-        self.board.trapper_turn = True
+        self.board.move_mouse(row, col)
 
     def trapper_move(self, x, y):
         """
@@ -113,16 +166,11 @@ class Game:
         if self.check_win():
             return
         row, col = self.board.get_hexagon(x, y)
-        if (row == -1 or col == -1) or (
-                self.board.matrix[row][col].is_obstacle or self.board.matrix[row][col].is_mouse):
-            return
-        self.board.matrix[row][col].set_obstacle()
-        self.board.matrix[row][col].is_obstacle = True
-        self.trapper_turn = False
-        self.board.trapper_turn = False
-        self.board.draw(self.screen)
-        if self.check_win():
+        if not self.state.is_legal_trapper_move(row, col):
             return
+        self.board.place_obstacle(row, col)
+        self.refresh_board()
+        self.check_win()
 
     def mouse_move(self, x, y):
         """
@@ -133,86 +181,64 @@ class Game:
         """
         if self.check_win():
             return
-        pygame.display.flip()
-        if self.mouse_position[0] % 2 == 1:
-            self.moves = MOVES_ODD_ROW
-        else:
-            self.moves = MOVES_EVEN_ROW
         row, col = self.board.get_hexagon(x, y)
-        if (row == -1 or col == -1) or (
-                self.board.matrix[row][col].is_obstacle or self.board.matrix[row][col].is_mouse):
-            return
-
-        row_diff = row - self.mouse_position[0]
-        col_diff = col - self.mouse_position[1]
-        if (row_diff, col_diff) in self.moves:
+        if self.state.is_legal_mouse_move(row, col):
             self.mouse_select(row, col)
 
-        self.board.draw(self.screen)
-        if self.check_win():
+        self.refresh_board()
+        self.check_win()
+
+    def ai_mouse_move(self, policy):
+        """
+            Starts computing the move of an engine policy for the mouse on the worker thread.
+            :param policy: function that takes the GameState and a cancel event and returns the (row, col) to move to
+            :return: starts the AI move, poll_ai plays it
+        """
+        if self.check_win() or self.worker.busy:
             return
+        self.worker.submit(self.profiler.timed("ai move", policy), self.state)
 
-    def ai_easy_mouse_move(self):
+    def poll_ai(self):
         """
-            Easy AI opponent that makes random moves.
+            Plays the move of the AI if it is ready.
             :return: moves the mouse
         """
-        if self.check_win():
+        move = self.worker.poll()
+        if move is None:
             return
-        pygame.display.flip()
-        if self.mouse_position[0] % 2 == 1:
-            self.moves = MOVES_ODD_ROW
-        else:
-            self.moves = MOVES_EVEN_ROW
+        if self.state.is_legal_mouse_move(*move):
+            self.mouse_select(*move)
+            self.refresh_board()
+        self.check_win()
 
-        row, col = self.random_move()
-        self.mouse_select(row, col)
-        self.board.draw(self.screen)
-        if self.check_win():
-            return
+    def ai_easy_mouse_move(self):
+        """
+            Easy AI opponent that makes random moves.
+            :return: starts the AI move
+        """
+        self.ai_mouse_move(lambda state, cancel: easy_mouse_move(state, self.rng))
 
     def ai_medium_mouse_move(self):
         """
-            Medium AI opponent that makes random moves 70% of the time and best moves 30% of the time.
-            :return: moves the mouse
+            Medium AI opponent that makes random moves 40% of the time and best moves 60% of the time.
+            :return: starts the AI move
         """
-        if self.check_win():
-            return
-        pygame.display.flip()
-        if self.mouse_position[0] % 2 == 1:
-            self.moves = MOVES_ODD_ROW
-        else:
-            self.moves = MOVES_EVEN_ROW
-        chance = random.randint(1, 10)
-        if chance <= 4:
-            move = self.random_move()
-            row, col = move[0], move[1]
-        else:
-            move = self.choose_best_move()
-            row, col = self.mouse_position[0] + move[0], self.mouse_position[1] + move[1]
-        self.mouse_select(row, col)
-        self.board.draw(self.screen)
-        if self.check_win():
-            return
+        self.ai_mouse_move(lambda state, cancel: medium_mouse_move(state, self.rng))
 
     def ai_hard_mouse_move(self):
         """
             Hard AI opponent that makes the best moves.
-            :return: moves the mouse
+            :return: starts the AI move
         """
-        if self.check_win():
-            return
-        pygame.display.flip()
-        if self.mouse_position[0] % 2 == 1:
-            self.moves = MOVES_ODD_ROW
-        else:
-            self.moves = MOVES_EVEN_ROW
-        move = self.choose_best_move()
-        row, col = self.mouse_position[0] + move[0], self.mouse_position[1] + move[1]
-        self.mouse_select(row, col)
-        self.board.draw(self.screen)
-        if self.check_win():
-            return
+        self.ai_mouse_move(lambda state, cancel: hard_mouse_move(state))
+
+    def ai_expert_mouse_move(self):
+        """
+            Expert AI opponent that searches with alpha-beta within a time budget; the search stops early when
+            the move is cancelled.
+            :return: starts the AI move
+        """
+        self.ai_mouse_move(self.expert)
 
     def back_menu(self):
         """
@@ -229,75 +255,6 @@ class Game:
         self.menu.draw_menu(self.menu_screen)
         pygame.display.flip()
 
-    def random_move(self):
-        """
-            Returns a random move.
-            :return: a random move
-        """
-        row, col = self.mouse_position
-        while True:
-            move = random.choice(self.moves)
-            new_row, new_col = row + move[0], col + move[1]
-            if (not self.board.matrix[new_row][new_col].is_obstacle and
-                    not self.board.matrix[new_row][new_col].is_mouse):
-                return new_row, new_col
-
-    def choose_best_move(self):
-        """
-            Calculates the best move based on distance to edge
-            :return: the best move
-        """
-        if self.mouse_position[0] % 2 == 1:
-            moves = MOVES_ODD_ROW
-        else:
-            moves = MOVES_EVEN_ROW
-        best_move = None
-        best_distance = float('inf')
-        distances = self.bfs_distances_from_edges()
-        for move in moves:
-            row = self.mouse_position[0] + move[0]
-            col = self.mouse_position[1] + move[1]
-            if not self.board.matrix[row][col].is_obstacle and not self.board.matrix[row][col].is_mouse:
-                if distances[row][col] <= best_distance:
-                    best_distance = distances[row][col]
-                    best_move = move
-        return best_move
-
-    def bfs_distances_from_edges(self):
-        """
-            Calculates the distances from the edges to the mouse position using BFS
-            :return: a matrix where each cell contains the distance from the edges
-        """
-        target_row, target_col = self.mouse_position
-        rows, cols = self.board.rows, self.board.cols
-        distances = [[float('inf')] * cols for _ in range(rows)]
-        visited = [[False] * cols for _ in range(rows)]
-        queue = deque()
-
-        for i in range(rows):
-            for j in range(cols):
-                if i == 0 or i == rows - 1 or j == 0 or j == cols - 1:
-                    queue.append((i, j, 0))
-                    visited[i][j] = True
-
-        while queue:
-            current_row, current_col, distance = queue.popleft()
-            distances[current_row][current_col] = distance
-            if current_row % 2 == 0:
-                directions = MOVES_EVEN_ROW
-            else:
-                directions = MOVES_ODD_ROW
-            neighbors = [(current_row + i, current_col + j) for i, j in directions]
-            if not (target_row, target_col) in neighbors:
-                for neighbor_row, neighbor_col in neighbors:
-                    if (0 <= neighbor_row < rows and 0 <= neighbor_col < cols
-                            and not visited[neighbor_row][neighbor_col]
-                            and not self.board.matrix[neighbor_row][neighbor_col].is_obstacle):
-                        queue.append((neighbor_row, neighbor_col, distance + 1))
-                        visited[neighbor_row][neighbor_col] = True
-
-        return distances
-
     def handle_menu_buttons(self, x, y):
         """
             Handles the menu buttons.
@@ -336,6 +293,11 @@ class Game:
             self.selector_active = False
             self.ai_level = 3
             pygame.time.wait(200)
+        elif is_button_clicked(x, y, self.menu.fourth_button):
+            self.start_game = True
+            self.selector_active = False
+            self.ai_level = 4
+            pygame.time.wait(200)
 
     def handle_game_buttons(self, x, y):
         """
@@ -355,23 +317,83 @@ class Game:
             :return: opens the game window and draws the game board
         """
         self.reset()
-        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.screen = pygame.display.set_mode(self.board.size)
         pygame.display.set_caption("Trap the Mouse")
-        screen.fill(LIGHT_GREEN)
+        self.screen.fill(LIGHT_GREEN)
         self.play = True
         self.start_game = False
+        self.update_hint()
         self.board.draw(self.screen)
         pygame.display.flip()
 
+    def is_idle(self):
+        """
+            Checks if the game is waiting for the player.
+            :return: True if nothing happens until the next event, False otherwise
+        """
+        ai_to_move = not self.is_human_opponent and not self.trapper_turn and self.ai_level in self.ai_levels
+        return not self.start_game and not ai_to_move and self.banner_until is None
+
+    def current_view(self):
+        """
+            Returns the screen that should be shown.
+            :return: "selector", "menu", "play" or None
+        """
+        if self.selector_active:
+            return "selector"
+        if self.menu_active:
+            return "menu"
+        if self.play:
+            return "play"
+        return None
+
     def run(self):
         """
             Runs the game.
+            Screens are drawn once when they are shown and the board is then updated with dirty rects; the loop
+            is capped at FPS frames per second and blocks on the event queue while waiting for the player.
+            AI moves are computed on the worker thread and polled every frame, and the winner banner is a timed
+            state of the loop, so the window keeps handling events while the AI thinks or the banner is shown.
+            With TRAP_PROFILE=1, or after pressing F3, the frames, the event handling, the drawing and the AI
+            moves are timed (see helpers/profiler.py); the waits for events and for the next frame are not.
             :return: runs the game
         """
+        clock = pygame.time.Clock()
+        drawn_view = None
+        profiler = self.profiler
         while self.running:
-            for event in pygame.event.get():
+            events = pygame.event.get()
+            if not events and self.is_idle():
+                events = [pygame.event.wait()]
+            with profiler.section("frame"):
+                drawn_view = self.frame(events, drawn_view)
+            if drawn_view == "play" and (profiler.enabled or profiler.overlay_rect is not None):
+                rects = profiler.draw_overlay(self.screen, self.board.draw_area)
+                if rects:
+                    pygame.display.update(rects)
+            profiler.tick()
+            clock.tick(FPS)
+
+        self.worker.close()
+        pygame.quit()
+
+    def frame(self, events, drawn_view):
+        """
+            Runs one frame of the loop: handles the events, plays the AI and draws what changed.
+            :param events: the pygame events of the frame
+            :param drawn_view: the view on the window before the frame
+            :return: the view on the window after the frame
+        """
+        with self.profiler.section("events"):
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                    self.hints = not self.hints
+                elif self.play and self.banner_until is None:
+                    self.board.handle_view_event(event)
 
                 if pygame.mouse.get_pressed()[0]:
                     x, y = pygame.mouse.get_pos()
@@ -385,36 +407,36 @@ class Game:
                         elif self.play:
                             self.handle_game_buttons(x, y)
                             if self.trapper_turn:
-                                self.board.trapper_turn = True
                                 self.trapper_move(x, y)
                             else:
-                                self.board.trapper_turn = False
                                 if self.is_human_opponent:
                                     self.mouse_move(x, y)
 
-            if not self.is_human_opponent and not self.trapper_turn:
-                if self.ai_level in self.ai_levels:
+        if not self.is_human_opponent and not self.trapper_turn:
+            if self.ai_level in self.ai_levels:
+                if self.worker.busy:
+                    self.poll_ai()
+                else:
                     self.ai_levels[self.ai_level]()
 
-            if self.selector_active:
-                self.menu.draw_ai_level_selector(self.menu_screen)
-                pygame.display.flip()
-                continue
-
-            if self.menu_active:
-                self.menu.draw_menu(self.menu_screen)
-                pygame.display.flip()
-                continue
-
-            if self.start_game:
-                self.handle_start_game()
-                continue
+        if self.banner_until is not None and pygame.time.get_ticks() >= self.banner_until:
+            self.close_banner()
 
-            if self.play:
-                self.board.draw(self.screen)
-                pygame.display.flip()
-                continue
+        if self.start_game:
+            self.handle_start_game()
+            return "play"
 
+        view = self.current_view()
+        if view != drawn_view:
+            if view == "selector":
+                self.menu.draw_ai_level_selector(self.menu_screen)
+            elif view == "menu":
+                self.menu.draw_menu(self.menu_screen)
+            elif view == "play":
+                self.update_hint()
+                with self.profiler.section("draw"):
+                    self.board.draw(self.screen)
             pygame.display.flip()
-
-        pygame.quit()
+        elif view == "play":
+            self.refresh_board()
+        return view
@@ -1,18 +1,29 @@
 """
     This module contains the GameBoard class.
 """
+import math
 import random
 
 import pygame
 
-from objects.hexagon import Hexagon
+from engine.bitboard import iter_bits
+from engine.game_state import GameState
+from objects.hexagon import hex_tiles, TILE_MARGIN
 from helpers.button import draw_button
+from helpers.geometry import HexLayout, fit_radius, BASE_RADIUS, SQRT3
 from helpers.text import write_turn
+from helpers.viewport import Viewport
 
 WIDTH, HEIGHT = 900, 630
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 LIGHT_GREEN = (43, 175, 98)
+BOARD_LEFT, BOARD_TOP = WIDTH * 0.4 - SQRT3 / 2 * BASE_RADIUS, HEIGHT / 10 - BASE_RADIUS
+BOARD_RIGHT_MARGIN, BOARD_BOTTOM_MARGIN = 25, 80
+MAX_WIDTH, MAX_HEIGHT = 1280, 900
+PAN_STEP = 100
+PAN_KEYS = {pygame.K_LEFT: (1, 0), pygame.K_RIGHT: (-1, 0), pygame.K_UP: (0, 1), pygame.K_DOWN: (0, -1)}
+OBSTACLE_RANGE = (3, 7)
 
 
 class GameBoard:
@@ -20,65 +31,386 @@ class GameBoard:
         This class represents the game board.
     """
 
-    def __init__(self, rows, cols):
+    def __init__(self, rows, cols, rng=random, start=None, density=None):
         """
-            Initializes the GameBoard class.
+            Initializes the GameBoard class. The hexagons shrink to fit the window and the window grows, up to
+            MAX_WIDTH x MAX_HEIGHT, when they cannot shrink any further; a board that still does not fit is
+            scrolled (see handle_view_event).
             :param rows: number of rows
             :param cols:  number of columns
+            :param rng: the random generator of the obstacles
+            :param start: the (row, col) cell of the mouse at the start, None for the center
+            :param density: the fraction of the cells that start as obstacles, None for 3 to 7 obstacles
         """
         self.rows = rows
         self.cols = cols
-        self.matrix = [[Hexagon(25, i, j) for i in range(cols)] for j in range(rows)]
-        self.matrix[5][5].set_mouse()
-        self.random_obstacles()
-        self.back_button = pygame.Rect(30, 570, 100, 40)
-        self.reset_button = pygame.Rect(30, 520, 100, 40)
-        self.trapper_turn = True
+        self.start = start
+        self.density = density
+        radius = fit_radius(rows, cols, WIDTH - BOARD_LEFT - BOARD_RIGHT_MARGIN,
+                            HEIGHT - BOARD_TOP - BOARD_BOTTOM_MARGIN)
+        board_width, board_height = HexLayout(radius, 0, 0).size(rows, cols)
+        self.width = min(max(WIDTH, math.ceil(BOARD_LEFT + board_width + BOARD_RIGHT_MARGIN)), MAX_WIDTH)
+        self.height = min(max(HEIGHT, math.ceil(BOARD_TOP + board_height + BOARD_BOTTOM_MARGIN)), MAX_HEIGHT)
+        area = (BOARD_LEFT, BOARD_TOP, self.width - BOARD_LEFT - BOARD_RIGHT_MARGIN,
+                self.height - BOARD_TOP - BOARD_BOTTOM_MARGIN)
+        self.viewport = Viewport(rows, cols, area, radius)
+        self.board_rect = pygame.Rect(area).inflate(2 * TILE_MARGIN, 2 * TILE_MARGIN)
+        self.back_button = pygame.Rect(30, self.height - 60, 100, 40)
+        self.reset_button = pygame.Rect(30, self.height - 110, 100, 40)
+        self.turn_rect = pygame.Rect(self.width / 2 - 100, self.height - 60, 250, 50)
+        self.pick_map = None
+        self.positions = None
+        self.background = None
+        self.reset(rng)
 
-    def random_obstacles(self):
+    @property
+    def size(self):
+        """
+            The size of the window the board needs.
+            :return: the (width, height) in pixels
+        """
+        return self.width, self.height
+
+    @property
+    def layout(self):
+        """
+            The layout of the hexagons on the window, for the current zoom and pan.
+            :return: the HexLayout
+        """
+        return self.viewport.layout
+
+    def reset(self, rng=random):
+        """
+            Starts a new game on the board; the geometry and the rendered background are kept.
+            :param rng: the random generator of the obstacles
+            :return: resets the game state
+        """
+        self.state = GameState(self.rows, self.cols, self.start)
+        self.random_obstacles(rng)
+        self.hint_mask = 0
+        self.drawn = None
+
+    @property
+    def trapper_turn(self):
+        """
+            Whose turn it is, read from the game state.
+            :return: True if it is the trapper's turn, False otherwise
+        """
+        return self.state.trapper_turn
+
+    def random_obstacles(self, rng=random):
         """
             Sets random obstacles on the game board.
+            :param rng: the random generator of the obstacles
             :return: sets random obstacles on the game board
         """
-        n = random.randint(3, 7)
-        for i in range(n):
-            row = random.randint(0, self.rows - 1)
-            col = random.randint(0, self.cols - 1)
-            if not self.matrix[row][col].is_mouse and not self.matrix[row][col].is_obstacle:
-                self.matrix[row][col].set_obstacle()
+        if self.density is None:
+            minimum, maximum = OBSTACLE_RANGE
+        else:
+            minimum = maximum = min(round(self.density * self.rows * self.cols), self.rows * self.cols - 1)
+        self.state.random_obstacles(minimum, maximum, rng)
+
+    def place_obstacle(self, row, col):
+        """
+            Plays a trapper move on the game state.
+            :param row: row of the obstacle
+            :param col: column of the obstacle
+            :return: places the obstacle
+        """
+        self.state.apply_trapper_move(row, col)
+
+    def move_mouse(self, row, col):
+        """
+            Plays a mouse move on the game state.
+            :param row: row of the new mouse position
+            :param col: column of the new mouse position
+            :return: moves the mouse
+        """
+        self.state.apply_mouse_move(row, col)
+
+    def tile_position(self, row, col):
+        """
+            Returns where the tile of a hexagon is stamped: its center rounded to a pixel.
+            :param row: row of the hexagon
+            :param col: column of the hexagon
+            :return: the (x, y) of the top left corner of the tile
+        """
+        x, y = self.layout.center(row, col)
+        half = self.layout.radius + TILE_MARGIN
+        return round(x) - half, round(y) - half
+
+    def visible_positions(self):
+        """
+            Finds the hexagons that paint inside the board area and where their tiles go; only these are drawn.
+            :return: a dict from cell index to tile position, in row-major order
+        """
+        layout = self.layout
+        half = layout.radius + TILE_MARGIN
+        positions = {}
+        for row, first, last in self.viewport.visible_rows(TILE_MARGIN):
+            shift = layout.odd_shift if row % 2 == 1 else 0
+            top = round(layout.center(row, first)[1]) - half
+            base = row * self.cols
+            for col in range(first, last + 1):
+                positions[base + col] = (round(col * layout.col_step + layout.origin_x + shift) - half, top)
+        return positions
+
+    def render_background(self):
+        """
+            Renders the parts of the board that only change with the view: the background, the visible empty
+            hexagons and buttons.
+            :return: the background surface
+        """
+        background = pygame.Surface(self.size)
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        background.fill(LIGHT_GREEN)
+        empty = hex_tiles(self.layout.radius).empty
+        background.set_clip(self.board_rect)
+        background.blits([(empty, position) for position in self.positions.values()], False)
+        background.set_clip(None)
+        draw_button(background, self.back_button, 'Back', (50, self.back_button.y), (255, 255, 255), (0, 0, 0))
+        draw_button(background, self.reset_button, 'Reset', (50, self.reset_button.y), (0, 0, 0), (255, 255, 255))
+        return background
+
+    def cell_rect(self, row, col):
+        """
+            Returns the screen area a hexagon can paint (polygon, border and mouse image).
+            :param row: row of the hexagon
+            :param col: column of the hexagon
+            :return: a pygame.Rect
+        """
+        size = hex_tiles(self.layout.radius).size
+        return pygame.Rect(self.tile_position(row, col), (size, size))
+
+    def mouse_stamp(self, tiles):
+        """
+            Returns the blit of the mouse image, centered on the hexagon of the mouse.
+            :param tiles: the HexTiles of the current radius
+            :return: a (surface, position) for Surface.blits
+        """
+        x, y = self.layout.center(*divmod(self.state.mouse, self.cols))
+        return tiles.mouse, (x - tiles.radius, y - tiles.radius)
+
+    def stamps(self, cells):
+        """
+            Lists the blits that paint cells: the tile of each visible cell, chosen by the state and the hint, and
+            the mouse image right after the tile of the mouse, so the hexagons overlap as if they were drawn one by
+            one.
+            :param cells: the cell indexes, in the order they are painted
+            :return: a list of (surface, position) for Surface.blits
+        """
+        tiles = hex_tiles(self.layout.radius)
+        obstacles = self.state.obstacles
+        hint_mask = self.hint_mask
+        mouse = self.state.mouse
+        stamps = []
+        for index in cells:
+            position = self.positions.get(index)
+            if position is None:
+                continue
+            if obstacles >> index & 1:
+                tile = tiles.obstacle
             else:
-                n += 1
+                tile = tiles.hint if hint_mask >> index & 1 else tiles.empty
+            stamps.append((tile, position))
+            if index == mouse:
+                stamps.append(self.mouse_stamp(tiles))
+        return stamps
+
+    def board_stamps(self):
+        """
+            Lists the blits that paint the whole board over the background. The background already holds every
+            visible empty hexagon, so only the obstacles, the hints, the mouse and the hexagons that overlap them
+            are stamped; the bits are read in one pass, as iterating over the bits of a large board is quadratic.
+            :return: a list of (surface, position) for Surface.blits
+        """
+        tiles = hex_tiles(self.layout.radius)
+        count = self.rows * self.cols
+        marked = self.state.obstacles | self.hint_mask | 1 << self.state.mouse
+        marked |= marked << 1 | marked >> 1
+        marked |= marked << self.cols | marked >> self.cols
+        marked = format(marked & (1 << count) - 1, f"0{count}b")[::-1]
+        obstacles = format(self.state.obstacles, f"0{count}b")[::-1]
+        hints = format(self.hint_mask & ~self.state.obstacles, f"0{count}b")[::-1]
+        kinds = {("0", "0"): tiles.empty, ("1", "0"): tiles.obstacle, ("0", "1"): tiles.hint}
+        mouse = self.state.mouse
+        stamps = []
+        for index, position in self.positions.items():
+            if marked[index] == "1":
+                stamps.append((kinds[obstacles[index], hints[index]], position))
+                if index == mouse:
+                    stamps.append(self.mouse_stamp(tiles))
+        return stamps
+
+    def draw_cell(self, surface, row, col):
+        """
+            Redraws the area of one hexagon: restores the background and restamps every hexagon that overlaps
+            it in the same order as a full draw, clipped to the area and to the board.
+            :param surface: surface of the pygame window
+            :param row: row of the hexagon
+            :param col: column of the hexagon
+            :return: the dirty pygame.Rect, None if the hexagon is out of view
+        """
+        if row * self.cols + col not in self.positions:
+            return None
+        rect = self.cell_rect(row, col).clip(self.board_rect)
+        cells = [neighbor_row * self.cols + neighbor_col
+                 for neighbor_row in range(max(row - 1, 0), min(row + 2, self.rows))
+                 for neighbor_col in range(max(col - 1, 0), min(col + 2, self.cols))]
+        clip = surface.get_clip()
+        surface.set_clip(rect)
+        surface.blit(self.background, rect, rect)
+        surface.blits(self.stamps(cells), False)
+        surface.set_clip(clip)
+        return rect
+
+    def draw_area(self, surface, rect):
+        """
+            Redraws an area of the window that something else was drawn over: restores the background, restamps
+            the visible hexagons that paint in it, in the same order as a full draw, and writes the turn again.
+            :param surface: surface of the pygame window
+            :param rect: the area
+            :return: the dirty pygame.Rect
+        """
+        rect = pygame.Rect(rect)
+        clip = surface.get_clip()
+        surface.set_clip(rect)
+        surface.blit(self.background, rect, rect)
+        surface.set_clip(rect.clip(self.board_rect))
+        rows = self.layout.cells_in_rect(rect.x, rect.y, rect.width, rect.height, self.rows, self.cols, TILE_MARGIN)
+        surface.blits(self.stamps([row * self.cols + col for row, first, last in rows
+                                   for col in range(first, last + 1)]), False)
+        if rect.colliderect(self.turn_rect):
+            surface.set_clip(rect)
+            self.draw_turn(surface)
+        surface.set_clip(clip)
+        return rect
+
+    def draw_turn(self, surface):
+        """
+            Writes whose turn it is.
+            :param surface: surface of the pygame window
+            :return: the dirty pygame.Rect
+        """
+        pygame.draw.rect(surface, LIGHT_GREEN, self.turn_rect)
+        if self.trapper_turn:
+            write_turn("Trapper's turn", surface, WHITE, self.turn_rect.topleft)
+        else:
+            write_turn("Mouse's turn", surface, BLACK, self.turn_rect.topleft)
+        return pygame.Rect(self.turn_rect)
 
     def draw(self, surface):
         """
-            Draws the game board (matrix of hexagons).
+            Draws the whole game board (the visible hexagons) in one batch of tile blits.
             :param surface: surface of the pygame window
             :return: draws a matrix of hexagons and a back button
         """
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self.matrix[row][col].draw(surface)
-        draw_button(surface, self.back_button, 'Back', (50, 570), (255, 255, 255), (0, 0, 0))
-        draw_button(surface, self.reset_button, 'Reset', (50, 520), (0, 0, 0), (255, 255, 255))
-        if self.trapper_turn:
-            pygame.draw.rect(surface, LIGHT_GREEN, (WIDTH / 2 - 100, 570, 250, 50))
-            write_turn("Trapper's turn", surface, WHITE)
+        self.drawn = None
+        self.update(surface)
+
+    def update(self, surface):
+        """
+            Redraws only what changed since the last draw: the hexagons whose obstacle, hint or mouse changed
+            and the turn label.
+            :param surface: surface of the pygame window
+            :return: the list of dirty rects to pass to pygame.display.update
+        """
+        if self.background is None:
+            self.positions = self.visible_positions()
+            self.background = self.render_background()
+        state = self.state
+        full = self.drawn is None
+        rects = []
+        if full:
+            surface.blit(self.background, (0, 0))
+            clip = surface.get_clip()
+            surface.set_clip(self.board_rect)
+            surface.blits(self.board_stamps(), False)
+            surface.set_clip(clip)
+            changed = 0
+            self.draw_turn(surface)
         else:
-            pygame.draw.rect(surface, LIGHT_GREEN, (WIDTH / 2 - 100, 570, 250, 50))
-            write_turn("Mouse's turn", surface, BLACK)
+            obstacles, hint_mask, mouse, trapper_turn = self.drawn
+            changed = obstacles ^ state.obstacles | hint_mask ^ self.hint_mask
+            if mouse != state.mouse:
+                changed |= 1 << mouse | 1 << state.mouse
+            if trapper_turn != state.trapper_turn:
+                rects.append(self.draw_turn(surface))
+        for index in iter_bits(changed):
+            rect = self.draw_cell(surface, *divmod(index, self.cols))
+            if rect is not None:
+                rects.append(rect)
+        self.drawn = (state.obstacles, self.hint_mask, state.mouse, state.trapper_turn)
+        return [surface.get_rect()] if full else rects
+
+    def view_changed(self):
+        """
+            Drops what was rendered for the previous view; the next update redraws the whole board.
+            :return: invalidates the background, the pick map and the drawn state
+        """
+        self.background = None
+        self.pick_map = None
+        self.drawn = None
+
+    def handle_view_event(self, event):
+        """
+            Zooms with the wheel, at the pointer, and pans with the arrow keys or by dragging with the right or
+            the middle button.
+            :param event: a pygame event
+            :return: True if the view changed, False otherwise
+        """
+        changed = False
+        if event.type == pygame.MOUSEWHEEL:
+            changed = self.viewport.zoom(event.y, *pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEMOTION and (event.buttons[1] or event.buttons[2]):
+            changed = self.viewport.pan(*event.rel)
+        elif event.type == pygame.KEYDOWN and event.key in PAN_KEYS:
+            dx, dy = PAN_KEYS[event.key]
+            changed = self.viewport.pan(dx * PAN_STEP, dy * PAN_STEP)
+        if changed:
+            self.view_changed()
+        return changed
 
     def get_hexagon(self, x, y):
         """
-            Gets the hexagon at the given coordinates.
+            Gets the hexagon at the given coordinates, through the zoom and pan of the view.
             :param x: x coordinate of the hexagon
             :param y: y coordinate of the hexagon
-            :return: the row and column of the hexagon
-        """
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if col == 0:
-                    if row % 2 == 0 and x < 337 or row % 2 == 1 and x < 357:
-                        break
-                if self.matrix[row][col].is_inside(x, y):
-                    return row, col
-        return -1, -1
+            :return: the row and column of the hexagon, (-1, -1) if there is none or it is out of view
+        """
+        if not self.board_rect.collidepoint(x, y):
+            return -1, -1
+        return self.layout.pick(x, y, self.rows, self.cols)
+
+    def render_pick_map(self):
+        """
+            Renders a surface where every visible hexagon is filled with the color (cell index + 1), 0 elsewhere.
+            :return: the pick-map surface
+        """
+        pick_map = pygame.Surface(self.size, depth=32)
+        pick_map.fill(0)
+        pick_map.set_clip(self.board_rect)
+        for row, first, last in self.viewport.visible_rows():
+            for col in range(first, last + 1):
+                index = row * self.cols + col + 1
+                color = pygame.Color(index >> 16 & 0xFF, index >> 8 & 0xFF, index & 0xFF)
+                pygame.draw.polygon(pick_map, color, self.layout.vertices(row, col))
+        return pick_map
+
+    def get_hexagon_from_pick_map(self, x, y):
+        """
+            Gets the hexagon at the given coordinates by reading the pick map, rendered on first use.
+            :param x: x coordinate of the hexagon
+            :param y: y coordinate of the hexagon
+            :return: the row and column of the hexagon, (-1, -1) if there is none
+        """
+        if self.pick_map is None:
+            self.pick_map = self.render_pick_map()
+        if not self.pick_map.get_rect().collidepoint(x, y):
+            return -1, -1
+        color = self.pick_map.get_at((int(x), int(y)))
+        index = (color.r << 16 | color.g << 8 | color.b) - 1
+        if index < 0:
+            return -1, -1
+        return divmod(index, self.cols)
@@ -1,95 +1,75 @@
 """
-    This module contains the Hexagon class.
+    This module contains the HexTiles class: the hexagons of one radius, rendered once and stamped on the board.
 """
-import math
+from functools import lru_cache
+
 import pygame
 
-width, height = 900, 630
+from helpers.assets import scaled_image, MOUSE_IMAGE
+from helpers.geometry import CORNERS
+
 BORDER_COLOR_DARK_GREEN = (21, 87, 49)
 FILL_COLOR_GREEN = (32, 131, 74)
 BORDER_COLOR_DARK_BROWN = (135, 62, 35)
 FILL_COLOR_BROWN = '#935139'
-IMAGE = pygame.image.load("../public/mouse1.png")
-IMAGE_SIZE = (50, 50)
-IMAGE = pygame.transform.scale(IMAGE, IMAGE_SIZE)
+FILL_COLOR_HINT = (214, 186, 72)
+BORDER_WIDTH = 6
+TILE_MARGIN = 4
+COLORKEY = (255, 0, 255)
 
 
-class Hexagon:
+class HexTiles:
     """
-        This class represents a hexagon.
+        This class holds an empty, an obstacle and a hint hexagon of one radius, each drawn once with
+        pygame.draw.polygon on a colorkeyed tile, and the mouse image at that radius. A tile is (2 * half + 1)
+        pixels wide with the center of the hexagon on pixel (half, half); the border reaches TILE_MARGIN pixels
+        out of the hexagon.
     """
 
-    def __init__(self, radius, row, col):
+    def __init__(self, radius):
         """
-            Initializes the Hexagon class.
-            :param radius: the radius of the hexagon
-            :param row: the row of the hexagon
-            :param col: the column of the hexagon
+            Initializes the HexTiles class.
+            :param radius: the radius of the hexagons
         """
         self.radius = radius
-        self.width = math.sqrt(3) * radius + 1.7
-        self.height = 2 * radius - 8
-        self.row = row
-        self.col = col
-        self.x = row * self.width + width * 0.4
-        self.y = col * self.height + height / 10
-        if col % 2 == 1:
-            self.x += self.height / 2
-        self.is_obstacle = False
-        self.is_mouse = False
-        self.points = []
-        for i in range(6):
-            angle = math.radians(60 * i)
-            hx = self.x + self.radius * math.sin(angle)
-            hy = self.y + self.radius * math.cos(angle)
-            self.points.append((hx, hy))
-
-    def set_obstacle(self):
-        """
-            Sets the hexagon as an obstacle.
-            :return: sets the hexagon as an obstacle
-        """
-        self.is_obstacle = True
+        self.half = radius + TILE_MARGIN
+        self.size = 2 * self.half + 1
+        self.empty = self.render(FILL_COLOR_GREEN, BORDER_COLOR_DARK_GREEN)
+        self.obstacle = self.render(FILL_COLOR_BROWN, BORDER_COLOR_DARK_BROWN)
+        self.hint = self.render(FILL_COLOR_HINT, BORDER_COLOR_DARK_GREEN)
 
-    def set_mouse(self):
+    def render(self, fill, border):
         """
-            Sets the hexagon as the mouse.
-            :return: sets the hexagon as the mouse
+            Draws a hexagon on a tile; the pixels around it have the colorkey, so blits skip them.
+            :param fill: the fill color
+            :param border: the border color
+            :return: the tile surface
         """
-        self.is_mouse = True
+        tile = pygame.Surface((self.size, self.size))
+        if pygame.display.get_surface() is not None:
+            tile = tile.convert()
+        tile.fill(COLORKEY)
+        points = [(self.half + self.radius * sin, self.half + self.radius * cos) for sin, cos in CORNERS]
+        pygame.draw.polygon(tile, fill, points, 0)
+        pygame.draw.polygon(tile, border, points, BORDER_WIDTH)
+        tile.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return tile
 
-    def is_inside(self, x, y):
+    @property
+    def mouse(self):
         """
-            Checks if a point is inside the hexagon.
-            :param x: x coordinate of the point
-            :param y: y coordinate of the point
-            :return: True if the point is inside the hexagon, False otherwise
+            The mouse image, covering the square around the hexagon.
+            :return: the pygame.Surface
         """
-        inside = False
-        n = len(self.points)
-        j = n - 1
-        for i in range(n - 1):
-            if ((self.points[i][1] > y) != (self.points[j][1] > y)
-                    and (x < (self.points[j][0] - self.points[i][0]) *
-                         (y - self.points[i][1]) / (self.points[j][1] - self.points[i][1])
-                         + self.points[i][0])):
-                inside = not inside
-            j = i
+        return scaled_image(MOUSE_IMAGE, (2 * self.radius, 2 * self.radius))
 
-        return inside
 
-    def draw(self, surface):
-        """
-            Draws a hexagon.
-            :param surface: surface of the pygame window
-            :return: draws a hexagon
-        """
-        if self.is_obstacle:
-            pygame.draw.polygon(surface, FILL_COLOR_BROWN, self.points, 0)
-            pygame.draw.polygon(surface, BORDER_COLOR_DARK_BROWN, self.points, 6)
-        else:
-            pygame.draw.polygon(surface, FILL_COLOR_GREEN, self.points, 0)
-            pygame.draw.polygon(surface, BORDER_COLOR_DARK_GREEN, self.points, 6)
-
-        if self.is_mouse:
-            surface.blit(pygame.transform.scale(IMAGE, IMAGE_SIZE), (self.x - self.radius, self.y - self.radius))
+@lru_cache(maxsize=16)
+def hex_tiles(radius):
+    """
+        Returns the tiles of a radius, rendered once. Call it after the display mode is set, so the tiles have the
+        pixel format of the display.
+        :param radius: the radius of the hexagons
+        :return: the HexTiles
+    """
+    return HexTiles(radius)
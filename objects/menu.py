@@ -2,7 +2,9 @@
     This module contains the Menu class.
 """
 import pygame
+from helpers.assets import scaled_image, MENU_IMAGE
 from helpers.button import draw_button
+from helpers.fonts import render_text
 
 WIDTH, HEIGHT = 700, 500
 BUTTON_WIDTH, BUTTON_HEIGHT = 200, 50
@@ -22,9 +24,16 @@ class Menu:
         """
         self.first_button = pygame.Rect((WIDTH - BUTTON_WIDTH) / 2, 200, BUTTON_WIDTH, BUTTON_HEIGHT)
         self.second_button = pygame.Rect((WIDTH - BUTTON_WIDTH) / 2, 300, BUTTON_WIDTH, BUTTON_HEIGHT)
-        self.third_button = pygame.Rect((WIDTH - BUTTON_WIDTH) / 2, 400, BUTTON_WIDTH, BUTTON_HEIGHT)
-        self.background_image = pygame.image.load("../public/menu_photo.png")
-        self.background_image = pygame.transform.scale(self.background_image, (WIDTH, HEIGHT))
+        self.third_button = pygame.Rect(WIDTH / 2 - BUTTON_WIDTH - 10, 400, BUTTON_WIDTH, BUTTON_HEIGHT)
+        self.fourth_button = pygame.Rect(WIDTH / 2 + 10, 400, BUTTON_WIDTH, BUTTON_HEIGHT)
+
+    @property
+    def background_image(self):
+        """
+            The background of the menu, loaded on first use.
+            :return: the pygame.Surface scaled to the menu
+        """
+        return scaled_image(MENU_IMAGE, (WIDTH, HEIGHT), alpha=False)
 
     def draw_menu(self, surface):
         """
@@ -35,10 +44,7 @@ class Menu:
 
         surface.blit(self.background_image, [0, 0])
 
-        pygame.font.init()
-        font_path = pygame.font.match_font("comicsansms")
-        font = pygame.font.Font(font_path, 36)
-        text = font.render("Trap the Mouse", True, WHITE)
+        text = render_text("Trap the Mouse", 36, WHITE)
         surface.blit(text, (215, 100))
 
         draw_button(surface, self.first_button, "Play vs AI", (WIDTH / 2 - 55, 210), BLACK, LIGHT_GREEN)
@@ -53,12 +59,10 @@ class Menu:
         """
         surface.blit(self.background_image, [0, 0])
 
-        pygame.font.init()
-        font_path = pygame.font.match_font("comicsansms")
-        font = pygame.font.Font(font_path, 36)
-        text = font.render("Select AI level", True, WHITE)
+        text = render_text("Select AI level", 36, WHITE)
         surface.blit(text, (215, 100))
 
         draw_button(surface, self.first_button, "Easy", (WIDTH / 2 - 30, 210), BLACK, LIGHT_GREEN)
         draw_button(surface, self.second_button, "Medium", (WIDTH / 2 - 50, 310), LIGHT_GREEN, BLACK)
-        draw_button(surface, self.third_button, "Hard", (WIDTH / 2 - 30, 410), BLACK, LIGHT_GREEN)
+        draw_button(surface, self.third_button, "Hard", (WIDTH / 2 - 140, 410), BLACK, LIGHT_GREEN)
+        draw_button(surface, self.fourth_button, "Expert", (WIDTH / 2 + 75, 410), LIGHT_GREEN, BLACK)
@@ -0,0 +1,151 @@
+"""
+    This module contains the RemoteGame class, the window of a networked match.
+"""
+import pygame
+
+from engine.game_state import TRAPPER
+from engine.protocol import parse_state
+from objects.game_board import GameBoard, WIDTH, HEIGHT
+from helpers.button import is_button_clicked
+from helpers.text import win
+
+FPS = 60
+
+
+class RemoteGame:
+    """
+        This class shows a match played on a MatchServer. The server owns the game: clicks are sent as moves and
+        the board only shows the positions the server sends back.
+    """
+
+    def __init__(self, client, rows=11, cols=11, match=None):
+        """
+            Initializes the RemoteGame class and hosts or joins a match.
+            :param client: the connected LineClient
+            :param rows: number of rows of a hosted match
+            :param cols: number of columns of a hosted match
+            :param match: the id of the match to join, None to host a new one
+        """
+        self.client = client
+        self.board = None
+        self.role = None
+        self.match = None
+        self.redraw = False
+        self.running = True
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Trap the Mouse")
+        if match is None:
+            client.send("HOST", rows, cols)
+        else:
+            client.send("JOIN", match)
+
+    @property
+    def my_turn(self):
+        """
+            Whether the server waits for a move of this side.
+            :return: True if it is this side's turn, False otherwise
+        """
+        return self.board is not None and (self.role == TRAPPER) == self.board.state.trapper_turn
+
+    def set_caption(self, status=None):
+        """
+            Shows the match, the side and an optional status in the title of the window.
+            :param status: text added to the title
+            :return: sets the caption
+        """
+        caption = f"Trap the Mouse - match {self.match} ({self.role})"
+        if status:
+            caption += f" - {status}"
+        pygame.display.set_caption(caption)
+
+    def show_state(self, words):
+        """
+            Shows a position sent by the server; the window is opened on the first one.
+            :param words: the words of the STATE message
+            :return: draws the board
+        """
+        state = parse_state(words)
+        if self.board is None or (self.board.rows, self.board.cols) != (state.rows, state.cols):
+            self.board = GameBoard(state.rows, state.cols)
+            self.screen = pygame.display.set_mode(self.board.size)
+            self.redraw = True
+        self.board.state = state
+        if self.redraw:
+            self.board.draw(self.screen)
+            pygame.display.flip()
+            self.redraw = False
+        else:
+            rects = self.board.update(self.screen)
+            if rects:
+                pygame.display.update(rects)
+
+    def handle_message(self, words):
+        """
+            Handles a message of the server.
+            :param words: the words of the message, empty when the connection closed
+            :return: updates the window
+        """
+        if not words:
+            print("Disconnected from the server")
+            self.running = False
+        elif words[0] == "MATCH":
+            self.match, self.role = words[1], words[2]
+            print(f"Match {self.match}, playing the {self.role}")
+            self.set_caption()
+        elif words[0] == "STATE":
+            self.set_caption()
+            self.show_state(words)
+        elif words[0] == "WIN":
+            pygame.display.update(win(words[1], self.screen))
+            self.redraw = True
+        elif words[0] == "RESET":
+            if words[1] != self.role:
+                self.set_caption(f"the {words[1]} asks for a new game, click Reset to agree")
+        elif words[0] == "LEFT":
+            self.set_caption("the opponent left")
+        elif words[0] == "ERROR":
+            print(" ".join(words[1:]))
+
+    def handle_click(self, x, y):
+        """
+            Handles a click on the board or on a button.
+            :param x: x coordinate of the click
+            :param y: y coordinate of the click
+            :return: sends the move or the command
+        """
+        if self.board is None:
+            return
+        if is_button_clicked(x, y, self.board.back_button):
+            self.running = False
+        elif is_button_clicked(x, y, self.board.reset_button):
+            self.client.send("RESET")
+        elif self.my_turn:
+            row, col = self.board.get_hexagon(x, y)
+            state = self.board.state
+            legal = state.is_legal_trapper_move if state.trapper_turn else state.is_legal_mouse_move
+            if legal(row, col):
+                self.client.send("MOVE", row, col)
+
+    def run(self):
+        """
+            Runs the window until it is closed, the Back button is clicked or the server disconnects.
+            :return: runs the match
+        """
+        clock = pygame.time.Clock()
+        while self.running:
+            moved = False
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    self.handle_click(*event.pos)
+                elif self.board is not None and self.board.handle_view_event(event):
+                    moved = True
+            if moved:
+                pygame.display.update(self.board.update(self.screen))
+            for words in self.client.poll():
+                self.handle_message(words)
+            clock.tick(FPS)
+
+        self.client.close()
+        pygame.quit()
@@ -2,10 +2,13 @@
     Main file for the game Trap the Mouse.
     This script starts the game.
 """
+import argparse
 
 import pygame
 
+from engine.client import LineClient
 from objects.game import Game
+from objects.remote_game import RemoteGame
 
 LIGHT_GREEN = (43, 175, 98)
 WHITE = (255, 255, 255)
@@ -13,9 +16,60 @@ WIDTH, HEIGHT = 900, 630
 MENU_WIDTH, MENU_HEIGHT = 700, 500
 
 
+def parse_cell(text):
+    """
+        Parses a "row,col" command line argument.
+        :param text: the argument
+        :return: the (row, col) cell
+    """
+    try:
+        row, col = (int(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected row,col, got {text!r}")
+    return row, col
+
+
+def parse_address(text):
+    """
+        Parses a "host:port" command line argument.
+        :param text: the argument
+        :return: the (host, port) address
+    """
+    host, _, port = text.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected host:port, got {text!r}")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Trap the Mouse")
+    parser.add_argument("--rows", type=int, default=11, help="number of rows")
+    parser.add_argument("--cols", type=int, default=11, help="number of columns")
+    parser.add_argument("--start", type=parse_cell, help="row,col of the mouse at the start (default: the center)")
+    parser.add_argument("--density", type=float, help="fraction of the cells that start as obstacles "
+                                                       "(default: 3 to 7 obstacles)")
+    parser.add_argument("--seed", type=int, help="seed of the obstacles and of the AI")
+    parser.add_argument("--connect", type=parse_address, help="host:port of a server (python -m src.server) "
+                                                              "to play a networked match")
+    parser.add_argument("--match", type=int, help="with --connect, the match to join (default: host a new one)")
+    args = parser.parse_args()
+    if args.rows < 3 or args.cols < 3:
+        parser.error("the board needs at least 3 rows and 3 columns")
+    if args.start is not None and not (0 <= args.start[0] < args.rows and 0 <= args.start[1] < args.cols):
+        parser.error(f"--start {args.start} is not on the board")
+    if args.density is not None and not 0 <= args.density < 1:
+        parser.error("--density must be in [0, 1)")
+
     pygame.init()
-    game = Game()
+    if args.connect is not None:
+        try:
+            client = LineClient(*args.connect)
+        except OSError as error:
+            parser.error(f"cannot connect to {args.connect[0]}:{args.connect[1]}: {error}")
+        RemoteGame(client, args.rows, args.cols, args.match).run()
+        return
+    game = Game(args.seed, args.rows, args.cols, args.start, args.density)
     game.run()
 
 
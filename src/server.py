@@ -0,0 +1,41 @@
+"""
+    Server of the networked two-player mode.
+    Hosts any number of matches; each client plays one side and every move is checked by the server.
+    Usage: python -m src.server [--host 0.0.0.0] [--port 7777] [--seed N]
+    Clients: python main.py --connect HOST:PORT (hosts a match and plays the trapper)
+             python main.py --connect HOST:PORT --match ID (joins the match and plays the mouse)
+"""
+import argparse
+import asyncio
+
+from engine.server import MatchServer
+
+
+async def serve(host, port, seed):
+    """
+        Runs the server until it is interrupted.
+        :param host: the address to listen on
+        :param port: the port
+        :param seed: seed of the obstacles
+        :return: serves forever
+    """
+    server = MatchServer(seed)
+    host, port = await server.start(host, port)
+    print(f"Listening on {host}:{port}")
+    await server.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trap the Mouse match server")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=7777, help="port to listen on")
+    parser.add_argument("--seed", type=int, help="seed of the obstacles")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
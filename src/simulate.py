@@ -0,0 +1,109 @@
+"""
+    Batch self-play for Trap the Mouse.
+    Plays N games between two agents on worker processes and streams one JSON line per game.
+    Usage: python -m src.simulate --games 1000 --mouse hard --trapper random --output results.jsonl
+    With --record, every game is also appended to a binary record file (see engine/record.py).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from engine.agents import make_agent, new_game, play_game, MOUSE_AGENTS, TRAPPER_AGENTS
+from engine.record import GameRecord, check_encodable
+
+SEED_STRIDE = 1000003
+
+
+def play_one(job):
+    """
+        Plays one game. This is the unit of work of a worker process.
+        :param job: (game number, seed, rows, cols, obstacles, minimum escape distance, escape, mouse spec,
+                    trapper spec, record)
+        :return: (result of the game as a dict, encoded GameRecord or None if the game is not recorded)
+    """
+    game, seed, rows, cols, obstacles, min_distance, escape, mouse_spec, trapper_spec, record = job
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    state = new_game(rows, cols, obstacles, rng, min_distance, escape)
+    mouse = make_agent(mouse_spec, trapper=False, rng=rng)
+    trapper = make_agent(trapper_spec, trapper=True, rng=rng)
+    winner = play_game(state, trapper, mouse)
+    for agent in (mouse, trapper):
+        if hasattr(agent, "close"):
+            agent.close()
+    record = GameRecord.from_state(state, seed).encode() if record else None
+    return {"game": game, "seed": seed, "rows": rows, "cols": cols, "obstacles": obstacles,
+            "mouse": mouse_spec, "trapper": trapper_spec, "winner": winner,
+            "plies": len(state.history), "seconds": round(time.perf_counter() - start, 6)}, record
+
+
+def jobs(args):
+    """
+        Generates the games to play; the seed of a game only depends on the run seed and the game number,
+        so results do not depend on the number of workers or on scheduling.
+        :param args: the parsed command line
+        :return: yields one job per game
+    """
+    for game in range(args.games):
+        yield (game, args.seed * SEED_STRIDE + game, args.rows, args.cols, args.obstacles,
+               args.min_distance, args.escape, args.mouse, args.trapper, args.record is not None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many games between two agents.")
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--mouse", default="hard", help=f"mouse agent: {', '.join(MOUSE_AGENTS)} "
+                                                        "(alphabeta:SECONDS, mcts:PLAYOUTS or mcts:SECONDSs)")
+    parser.add_argument("--trapper", default="random", help=f"trapper agent: {', '.join(TRAPPER_AGENTS)}")
+    parser.add_argument("--rows", type=int, default=11, help="number of rows")
+    parser.add_argument("--cols", type=int, default=11, help="number of columns")
+    parser.add_argument("--obstacles", type=int, default=5, help="number of random starting obstacles")
+    parser.add_argument("--min-distance", type=int, default=0,
+                        help="the mouse needs at least this many moves to reach the edge at the start")
+    parser.add_argument("--escape", action="store_true", help="only start from positions where the mouse can escape")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the run")
+    parser.add_argument("--output", default="-", help="JSON Lines file for per-game results ('-' for stdout)")
+    parser.add_argument("--record", help="binary file the game records are appended to")
+    args = parser.parse_args()
+    try:
+        make_agent(args.mouse, trapper=False)
+        make_agent(args.trapper, trapper=True)
+    except ValueError as error:
+        parser.error(str(error))
+    if not 0 <= args.obstacles < args.rows * args.cols:
+        parser.error(f"--obstacles must be between 0 and {args.rows * args.cols - 1}")
+    if args.record:
+        try:
+            check_encodable(args.rows, args.cols, range(args.seed * SEED_STRIDE, args.seed * SEED_STRIDE + args.games))
+        except ValueError as error:
+            parser.error(f"--record: {error}")
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    report = sys.stderr if output is sys.stdout else sys.stdout
+    records = open(args.record, "ab") if args.record else None
+    wins = {}
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        for result, record in pool.imap_unordered(play_one, jobs(args), chunksize=4):
+            output.write(json.dumps(result) + "\n")
+            if records is not None:
+                records.write(record)
+            wins[result["winner"]] = wins.get(result["winner"], 0) + 1
+    elapsed = time.perf_counter() - start
+    if output is not sys.stdout:
+        output.close()
+    if records is not None:
+        records.close()
+
+    for winner, count in sorted(wins.items(), key=lambda item: str(item[0])):
+        print(f"{winner or 'Unfinished'}: {count}/{args.games} ({100 * count / args.games:.1f}%)", file=report)
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.1f} games/s)", file=report)
+
+
+if __name__ == "__main__":
+    main()
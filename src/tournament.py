@@ -0,0 +1,146 @@
+"""
+    Round-robin tournament between agents, with Elo ratings and early stopping.
+    Every pairing plays game pairs: both games start from the same seeded position and the entrants swap the
+    mouse and trapper roles. A pairing stops as soon as an SPRT decides that one entrant is at least --elo points
+    stronger or that neither is, or after --max-games games.
+    An entrant is an agent that plays both roles ("alphabeta:0.01", "mcts:200") or MOUSE+TRAPPER ("hard+random").
+    Entrants that share their trapper compare their mice, e.g.
+    python -m src.tournament hard+alphabeta:0.002 medium+alphabeta:0.002 easy+alphabeta:0.002 --output games.jsonl
+"""
+import argparse
+import json
+import os
+import time
+from itertools import combinations
+from multiprocessing import Pool
+
+from engine.agents import make_agent
+from engine.elo import Score, sprt, bradley_terry
+from engine.game_state import MOUSE, TRAPPER
+from src.simulate import play_one, SEED_STRIDE
+
+RESULTS = {MOUSE: (1, 0), TRAPPER: (0, 1), None: (0.5, 0.5)}
+
+
+def parse_entrant(spec):
+    """
+        Splits an entrant into its mouse and trapper agents.
+        :param spec: "NAME[:ARGUMENT]" for an agent that plays both roles, or "MOUSE+TRAPPER"
+        :return: the (mouse spec, trapper spec), raises ValueError if an agent is unknown
+    """
+    mouse, plus, trapper = spec.partition("+")
+    if not plus:
+        trapper = mouse
+    make_agent(mouse, trapper=False)
+    make_agent(trapper, trapper=True)
+    return mouse, trapper
+
+
+def play_pair_game(job):
+    """
+        Plays one game of a pairing. This is the unit of work of a worker process.
+        :param job: (pairing, True if the first entrant is the mouse, job of src.simulate.play_one)
+        :return: (pairing, first entrant is the mouse, result of the game as a dict)
+    """
+    pairing, first_is_mouse, game = job
+    result, _ = play_one(game)
+    return pairing, first_is_mouse, result
+
+
+def pair_jobs(pairing, first, second, seeds, args):
+    """
+        Generates the games of a batch of game pairs.
+        :param pairing: the (i, j) indexes of the entrants
+        :param first: the (mouse spec, trapper spec) of entrant i
+        :param second: the (mouse spec, trapper spec) of entrant j
+        :param seeds: the seeds of the starting positions, one per game pair (the game number is the seed
+                      minus the seed of the run, the same for both games of a pair)
+        :param args: the parsed command line
+        :return: yields two jobs per seed, one per role assignment
+    """
+    for seed in seeds:
+        for first_is_mouse in (True, False):
+            mouse, trapper = (first[0], second[1]) if first_is_mouse else (second[0], first[1])
+            yield pairing, first_is_mouse, (seed - args.seed * SEED_STRIDE, seed, args.rows, args.cols,
+                                            args.obstacles, args.min_distance, args.escape, mouse, trapper, False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament with Elo ratings and SPRT early stopping.")
+    parser.add_argument("entrants", nargs="+", help="agents that play both roles, or MOUSE+TRAPPER pairs")
+    parser.add_argument("--max-games", type=int, default=1000, help="maximum number of games per pairing")
+    parser.add_argument("--batch", type=int, default=20, help="game pairs per pairing between two SPRT checks")
+    parser.add_argument("--elo", type=float, default=50, help="Elo difference that counts as clearly stronger")
+    parser.add_argument("--alpha", type=float, default=0.05, help="false positive rate of the SPRT")
+    parser.add_argument("--beta", type=float, default=0.05, help="false negative rate of the SPRT")
+    parser.add_argument("--no-sprt", action="store_true", help="always play --max-games games per pairing")
+    parser.add_argument("--rows", type=int, default=11, help="number of rows")
+    parser.add_argument("--cols", type=int, default=11, help="number of columns")
+    parser.add_argument("--obstacles", type=int, default=5, help="number of random starting obstacles")
+    parser.add_argument("--min-distance", type=int, default=0,
+                        help="the mouse needs at least this many moves to reach the edge at the start")
+    parser.add_argument("--escape", action="store_true", help="only start from positions where the mouse can escape")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the run")
+    parser.add_argument("--output", help="JSON Lines file for per-game results")
+    args = parser.parse_args()
+    if len(args.entrants) < 2:
+        parser.error("a tournament needs at least 2 entrants")
+    try:
+        entrants = [parse_entrant(spec) for spec in args.entrants]
+    except ValueError as error:
+        parser.error(str(error))
+    if not 0 <= args.obstacles < args.rows * args.cols:
+        parser.error(f"--obstacles must be between 0 and {args.rows * args.cols - 1}")
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    scores = {pairing: Score() for pairing in combinations(range(len(entrants)), 2)}
+    verdicts = {}
+    next_seed = 0
+    start = time.perf_counter()
+    with Pool(args.workers) as pool:
+        while len(verdicts) < len(scores):
+            jobs = []
+            for (i, j), score in scores.items():
+                if (i, j) in verdicts:
+                    continue
+                pairs = min(args.batch, (args.max_games - score.games) // 2)
+                seeds = range(args.seed * SEED_STRIDE + next_seed, args.seed * SEED_STRIDE + next_seed + pairs)
+                next_seed += pairs
+                jobs.extend(pair_jobs((i, j), entrants[i], entrants[j], seeds, args))
+            for pairing, first_is_mouse, result in pool.imap_unordered(play_pair_game, jobs, chunksize=2):
+                mouse_points, trapper_points = RESULTS[result["winner"]]
+                scores[pairing].add(mouse_points if first_is_mouse else trapper_points)
+                if output is not None:
+                    i, j = pairing
+                    output.write(json.dumps({**result, "entrants": [args.entrants[i], args.entrants[j]]}) + "\n")
+            for pairing, score in scores.items():
+                if pairing in verdicts:
+                    continue
+                verdict = None if args.no_sprt else sprt(score, args.elo, args.alpha, args.beta)
+                if verdict is not None or (args.max_games - score.games) // 2 == 0:
+                    verdicts[pairing] = verdict
+    elapsed = time.perf_counter() - start
+    if output is not None:
+        output.close()
+
+    names = args.entrants
+    played = sum(score.games for score in scores.values())
+    for (i, j), score in scores.items():
+        elo, low, high = score.elo()
+        verdict = {1: f"{names[i]} is stronger", -1: f"{names[j]} is stronger", 0: "no clear difference",
+                   None: "undecided"}[verdicts[(i, j)]]
+        print(f"{names[i]} vs {names[j]}: +{score.wins} ={score.draws} -{score.losses} in {score.games} games, "
+              f"Elo {elo:+.0f} [{low:+.0f}, {high:+.0f}], {verdict}")
+    print("Ratings:")
+    ratings = bradley_terry(scores, len(entrants))
+    for index in sorted(range(len(entrants)), key=lambda index: -ratings[index][0]):
+        rating, margin = ratings[index]
+        print(f"  {names[index]:24} {rating:+7.0f} +- {margin:.0f}")
+    budget = len(scores) * (args.max_games - args.max_games % 2)
+    print(f"{played} games in {elapsed:.2f}s ({played / elapsed:.1f} games/s), "
+          f"{budget - played} of {budget} games saved by early stopping")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+    Checks that DistanceField repairs the distances to the same values as a fresh BFS over random games.
+"""
+import random
+
+import pytest
+
+from engine.distances import DistanceField, bfs_distances
+from engine.positions import random_position
+
+GAMES = 40
+PLIES = 60
+
+
+def random_ply(state, rng):
+    """
+        Changes a state the way the games and the AIs do: a move, an undo, or a direct edit of the obstacles or of
+        the mouse.
+        :param state: the GameState
+        :param rng: the random generator
+        :return: changes the state
+    """
+    kind = rng.random()
+    if kind < 0.15 and state.history:
+        state.undo()
+    elif kind < 0.25:
+        state.obstacles ^= 1 << rng.randrange(state.topology.size)
+        state.obstacles &= ~(1 << state.mouse)
+    elif kind < 0.3:
+        state.mouse = rng.choice([index for index in range(state.topology.size) if not state.obstacles >> index & 1])
+    elif state.winner() is None:
+        state.apply_move(*rng.choice(state.legal_trapper_moves() if state.trapper_turn
+                                     else state.legal_mouse_moves()))
+
+
+@pytest.mark.parametrize("size", [5, 7, 11, 15])
+def test_update_matches_bfs(size):
+    rng = random.Random(size)
+    for _ in range(GAMES):
+        state = random_position(size, size, rng.randint(0, size * size // 4), rng)
+        field = DistanceField(state)
+        for _ in range(PLIES):
+            random_ply(state, rng)
+            assert field.update(state) == bfs_distances(state)
+
+
+def test_update_after_many_changes():
+    rng = random.Random(0)
+    state = random_position(11, 11, 10, rng)
+    field = DistanceField(state)
+    state.obstacles = random_position(11, 11, 40, rng).obstacles
+    assert field.update(state) == bfs_distances(state)
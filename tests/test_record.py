@@ -0,0 +1,30 @@
+"""
+    Checks that game records survive encoding on every cell width and that records that do not fit are refused.
+"""
+import random
+
+import pytest
+
+from engine.record import GameRecord, check_encodable, cell_width
+
+
+@pytest.mark.parametrize("rows, cols", [(11, 11), (256, 5), (300, 300)])
+def test_encode_decode(rows, cols):
+    rng = random.Random(rows)
+    cells = rng.sample(range(rows * cols), 60)
+    record = GameRecord(2 ** 64 - 1, rows, cols, cells[0], sorted(cells[1:30]), cells[30:], "Mouse")
+    data = record.encode()
+    decoded, end = GameRecord.decode(data)
+    assert end == len(data)
+    assert vars(decoded) == vars(record)
+
+
+def test_cell_width():
+    assert [cell_width(16, 16), cell_width(256, 256), cell_width(257, 256)] == [1, 2, 4]
+
+
+@pytest.mark.parametrize("rows, cols, seeds", [(0, 5, range(1)), (65536, 1, range(1)), (11, 11, range(-1, 1)),
+                                               (11, 11, range(2 ** 64, 2 ** 64 + 1))])
+def test_check_encodable(rows, cols, seeds):
+    with pytest.raises(ValueError):
+        check_encodable(rows, cols, seeds)
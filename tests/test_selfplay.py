@@ -0,0 +1,32 @@
+"""
+    Checks that the jobs of self-play and of tournaments both fit play_one, the game of a worker process.
+"""
+from argparse import Namespace
+
+from src.simulate import jobs, play_one, SEED_STRIDE
+from src.tournament import pair_jobs, play_pair_game
+
+
+def arguments(**changes):
+    values = {"games": 2, "seed": 1, "rows": 7, "cols": 7, "obstacles": 5, "min_distance": 0, "escape": False,
+              "mouse": "hard", "trapper": "random", "record": None}
+    values.update(changes)
+    return Namespace(**values)
+
+
+def test_simulate_jobs():
+    for job in jobs(arguments()):
+        result, record = play_one(job)
+        assert result["rows"] == 7 and record is None
+
+
+def test_simulate_jobs_recorded():
+    result, record = play_one(next(jobs(arguments(record="games.bin"))))
+    assert record[:2] == b"T2"
+
+
+def test_tournament_jobs():
+    args = arguments()
+    for job in pair_jobs((0, 1), ("hard", "random"), ("easy", "random"), [args.seed * SEED_STRIDE], args):
+        pairing, first_is_mouse, result = play_pair_game(job)
+        assert pairing == (0, 1) and result["winner"] is not None
@@ -0,0 +1,85 @@
+"""
+    Checks that a side of a match cannot restart a game in progress on its own and that bad input is refused
+    without dropping the connection.
+"""
+import asyncio
+
+from engine.protocol import decode, encode
+from engine.server import MatchServer
+
+
+async def send(writer, reader, *words):
+    writer.write(encode(*words))
+    await writer.drain()
+    return decode(await reader.readline())
+
+
+async def reset_match():
+    server = MatchServer(seed=0)
+    host, port = await server.start()
+    trapper_reader, trapper = await asyncio.open_connection(host, port)
+    mouse_reader, mouse = await asyncio.open_connection(host, port)
+    try:
+        assert (await send(trapper, trapper_reader, "HOST"))[0] == "MATCH"
+        await trapper_reader.readline()
+        assert (await send(mouse, mouse_reader, "JOIN", 1))[0] == "MATCH"
+        await mouse_reader.readline()
+        await trapper_reader.readline()
+        match = server.matches[1]
+        state = match.state
+
+        assert await send(trapper, trapper_reader, "RESET") == ["RESET", "Trapper"]
+        assert decode(await mouse_reader.readline()) == ["RESET", "Trapper"]
+        assert match.state is state
+        row, col = next((row, col) for row, col in state.legal_trapper_moves() if not state.is_border(row, col))
+        assert (await send(trapper, trapper_reader, "MOVE", row, col))[0] == "STATE"
+        await mouse_reader.readline()
+        assert not match.resets
+
+        assert await send(trapper, trapper_reader, "RESET") == ["RESET", "Trapper"]
+        await mouse_reader.readline()
+        assert (await send(mouse, mouse_reader, "RESET"))[0] == "STATE"
+        await trapper_reader.readline()
+        assert match.state is not state
+
+        state = match.state
+        for index in state.topology.neighbor_cells[state.mouse]:
+            state.obstacles |= 1 << index
+        assert (await send(mouse, mouse_reader, "RESET"))[0] == "STATE"
+        assert match.state is not state
+        await trapper_reader.readline()
+
+        state = match.state
+        mouse.close()
+        assert decode(await trapper_reader.readline()) == ["LEFT"]
+        assert (await send(trapper, trapper_reader, "RESET"))[0] == "STATE"
+        assert match.state is not state
+    finally:
+        trapper.close()
+        mouse.close()
+        await server.close()
+
+
+def test_reset_needs_both_sides_during_a_game():
+    asyncio.run(reset_match())
+
+
+async def non_ascii_move():
+    server = MatchServer(seed=0)
+    host, port = await server.start()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        assert (await send(writer, reader, "HOST"))[0] == "MATCH"
+        await reader.readline()
+        writer.write(b"MOVE \xc3\xa9 1\n")
+        await writer.drain()
+        assert decode(await reader.readline())[0] == "ERROR"
+        assert (await send(writer, reader, "RESET"))[0] == "STATE"
+        assert 1 in server.matches
+    finally:
+        writer.close()
+        await server.close()
+
+
+def test_non_ascii_input_is_refused():
+    asyncio.run(non_ascii_move())
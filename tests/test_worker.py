@@ -0,0 +1,30 @@
+"""
+    Checks that the AI moves computed on the MoveWorker repair the distances of the previous move.
+"""
+import random
+
+import engine.distances
+from engine.mouse_ai import hard_mouse_move, best_move_cache
+from engine.positions import random_position
+from engine.worker import MoveWorker
+
+
+def test_hard_moves_repair_the_distances(monkeypatch):
+    calls = []
+    bfs_distances = engine.distances.bfs_distances
+    monkeypatch.setattr(engine.distances, "bfs_distances", lambda state: calls.append(1) or bfs_distances(state))
+    best_move_cache.clear()
+    rng = random.Random(0)
+    state = random_position(51, 51, 100, rng, min_distance=20)
+    worker = MoveWorker()
+    try:
+        for _ in range(15):
+            state.apply_trapper_move(*rng.choice(state.legal_trapper_moves()))
+            worker.submit(lambda position, cancel: hard_mouse_move(position), state)
+            move = worker.future.result()
+            worker.poll()
+            state.apply_mouse_move(*move)
+            assert worker.state.obstacles == state.obstacles and worker.state is not state
+    finally:
+        worker.close()
+    assert len(calls) == 1